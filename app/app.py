@@ -4,8 +4,10 @@ from pathlib import Path
 from html import escape
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as SATimeoutError
 from sqlalchemy.engine import URL
 import streamlit as st
 import re
@@ -13,11 +15,31 @@ import csv
 import json
 import uuid
 import time
+import threading
+import queue
+import atexit
+import platform
+import logging
+import functools
+import bisect
+from contextlib import contextmanager
+import hmac
+import hashlib
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from urllib.parse import urlparse
 import requests
 import streamlit.components.v1 as components
 from streamlit.components.v1 import declare_component
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.web.server.websocket_headers import _get_websocket_headers
 from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Modules shared with the scripts live next to this file
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from catalog_schema import AREA_SCOPES, FORM_OPTION_COLUMNS, FORM_OPTION_TABLES, area_pairs, with_other
 
 # ---------- SITE & THEME ----------
 st.set_page_config(
@@ -29,7 +51,11 @@ st.set_page_config(
 
 
 
-VERIFY_URL = "https://challenges.cloudflare.com/turnstile/v0/siteverify"
+# Overridable so tests can point at a local stub verifier
+VERIFY_URL = os.getenv("TURNSTILE_VERIFY_URL", "https://challenges.cloudflare.com/turnstile/v0/siteverify")
+TURNSTILE_CONNECT_TIMEOUT_S = float(os.getenv("TURNSTILE_CONNECT_TIMEOUT_S", "3"))
+TURNSTILE_READ_TIMEOUT_S = float(os.getenv("TURNSTILE_READ_TIMEOUT_S", "6"))
+TURNSTILE_WORKERS = int(os.getenv("TURNSTILE_WORKERS", "4"))
 TURNSTILE_SITE_KEY = os.getenv("TURNSTILE_SITE_KEY", "")
 TURNSTILE_SECRET_KEY = os.getenv("TURNSTILE_SECRET_KEY", "")
 # Turnstile tokens are short-lived. Require a fresh token at submit time.
@@ -47,7 +73,29 @@ TURNSTILE_MAX_TOKEN_AGE_S = int(os.getenv("TURNSTILE_MAX_TOKEN_AGE_S", "120"))
 # </script>
 # """, unsafe_allow_html=True)
 
-def verify_turnstile(token: str, remote_ip: str | None = None) -> tuple[bool, dict]:
+# A small worker pool per process, shared by all sessions. Each worker keeps its
+# own keep-alive session (requests.Session is not thread-safe) and so reuses its
+# TLS connection to Cloudflare. A submit that finds every worker busy for
+# TURNSTILE_QUEUE_TIMEOUT_S fails fast instead of queueing behind the burst, so
+# the wait is bounded by that plus the HTTP timeouts.
+TURNSTILE_QUEUE_TIMEOUT_S = float(os.getenv("TURNSTILE_QUEUE_TIMEOUT_S", "1.5"))
+
+@st.cache_resource
+def get_verify_sessions() -> threading.local:
+    return threading.local()
+
+@st.cache_resource
+def get_verify_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=TURNSTILE_WORKERS, thread_name_prefix="turnstile")
+
+def _worker_session(sessions: threading.local) -> requests.Session:
+    session = getattr(sessions, "session", None)
+    if session is None:
+        session = sessions.session = requests.Session()
+    return session
+
+def verify_turnstile(token: str, remote_ip: str | None = None,
+                     session: requests.Session | None = None) -> tuple[bool, dict]:
     secret = os.getenv("TURNSTILE_SECRET_KEY", "")
     if not token or not secret:
         return False, {"reason": "missing token or secret"}
@@ -60,13 +108,53 @@ def verify_turnstile(token: str, remote_ip: str | None = None) -> tuple[bool, di
         data["remoteip"] = remote_ip
 
     try:
-        import requests
-        r = requests.post(VERIFY_URL, data=data, timeout=6)
+        r = (session or requests).post(
+            VERIFY_URL, data=data, timeout=(TURNSTILE_CONNECT_TIMEOUT_S, TURNSTILE_READ_TIMEOUT_S)
+        )
         j = r.json()
         return bool(j.get("success")), j
     except Exception as e:
         return False, {"exception": str(e)}
 
+class PendingVerification:
+    """A queued siteverify call; `started_at` is set when a worker picks it up."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.started_at = 0.0
+        self.future: Future | None = None
+
+def verify_turnstile_async(token: str, remote_ip: str | None = None) -> PendingVerification:
+    """Queue `verify_turnstile` on the worker pool; collect it with `wait_turnstile`."""
+    # Resolve cached resources here: worker threads have no script run context
+    sessions = get_verify_sessions()
+    pending = PendingVerification()
+
+    def run():
+        pending.started_at = time.monotonic()
+        pending.started.set()
+        return verify_turnstile(token, remote_ip, _worker_session(sessions))
+
+    pending.future = get_verify_executor().submit(run)
+    return pending
+
+def wait_turnstile(pending: PendingVerification) -> tuple[bool, dict]:
+    """
+    Result of a queued verification. A call no worker has picked up within
+    TURNSTILE_QUEUE_TIMEOUT_S is cancelled (the token was never sent, so the
+    user can verify again); once started, the request timeout counts from the
+    start, not from when it was queued.
+    """
+    if not pending.started.wait(TURNSTILE_QUEUE_TIMEOUT_S):
+        if pending.future.cancel():
+            return False, {"exception": "verification queue busy"}
+        pending.started.wait()  # picked up just now
+    budget = TURNSTILE_CONNECT_TIMEOUT_S + TURNSTILE_READ_TIMEOUT_S + 1
+    try:
+        return pending.future.result(timeout=max(budget - (time.monotonic() - pending.started_at), 0))
+    except FuturesTimeoutError:
+        return False, {"exception": "verification timed out"}
+
 def get_query_param(name: str) -> str | None:
     params = st.query_params
     val = params.get(name)
@@ -99,15 +187,67 @@ BANNERS_DIR = ASSETS_DIR / "tool_banners"          # public/assets/tool_banners/
 STATIC_BASE = os.getenv("STATIC_BASE", "").rstrip("/")
 STATIC_ASSETS = f"{STATIC_BASE}/assets" if STATIC_BASE else "/assets"
 
+# ---------- ASSET MANIFEST ----------
+# scripts/prepare_tool_assets.py (brand/team/hero modes) writes right-sized
+# variants of the site chrome and records them in public/assets/manifest.json,
+# keyed by the original path under /assets. Without an entry we serve the original.
+ASSET_MANIFEST_PATH = ASSETS_DIR / "manifest.json"
+
+
+def _asset_manifest_mtime() -> float:
+    try:
+        return ASSET_MANIFEST_PATH.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_asset_manifest(mtime: float) -> dict:
+    """Parsed manifest entries; keyed on mtime so a regenerated manifest is picked up."""
+    if not mtime:
+        return {}
+    try:
+        data = json.loads(ASSET_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("assets", {})
+
+
+ASSET_MANIFEST = load_asset_manifest(_asset_manifest_mtime())
+
+
+def asset_url(rel: str) -> str:
+    """URL of the optimized default variant of public/assets/<rel>, else the original."""
+    entry = ASSET_MANIFEST.get(rel)
+    return f"{STATIC_ASSETS}/{entry['src'] if entry else rel}"
+
+
+def asset_srcset(rel: str, mime: str = "image/webp") -> str:
+    """'url 320w, url 640w' for an <img srcset>, or '' when the asset has no variants."""
+    entry = ASSET_MANIFEST.get(rel) or {}
+    return ", ".join(f"{STATIC_ASSETS}/{path} {w}w" for w, path in entry.get("srcset", {}).get(mime, []))
+
+
+def img_srcset_attrs(rel: str, sizes: str) -> str:
+    """src/srcset/sizes attributes for an <img> tag (just src when there are no variants)."""
+    srcset = asset_srcset(rel)
+    attrs = f'src="{asset_url(rel)}"'
+    if srcset:
+        attrs += f' srcset="{srcset}" sizes="{sizes}"'
+    return attrs
+
+
 # Common URLs
-AT_LOGO_URL = f"{STATIC_ASSETS}/adapt-tools-logo/adapt-tools_logo.svg"
-AT_LOGO_WIDE_URL = f"{STATIC_ASSETS}/adapt-tools-logo/adapt-tools_logo_wide.svg"
-LOGO_URL = f"{STATIC_ASSETS}/site_banner/futuremed_logo.png"
-HERO_BANNER_URL = f"{STATIC_ASSETS}/site_banner/futuremed_banner.jpg"
+AT_LOGO_REL = "adapt-tools-logo/adapt-tools_logo.svg"
+AT_LOGO_WIDE_REL = "adapt-tools-logo/adapt-tools_logo_wide.svg"
+LOGO_REL = "site_banner/futuremed_logo.png"
+AT_LOGO_URL = asset_url(AT_LOGO_REL)
+AT_LOGO_WIDE_URL = asset_url(AT_LOGO_WIDE_REL)
+LOGO_URL = asset_url(LOGO_REL)
+HERO_BANNER_URL = asset_url("site_banner/futuremed_banner.jpg")
 PLACEHOLDER_URL = f"{STATIC_ASSETS}/placeholder.png"
 TOOLS_URL_BASE = f"{STATIC_ASSETS}/tools"
 TOOL_BANNERS_URL_BASE = f"{STATIC_ASSETS}/tool_banners"
-TEAM_URL_BASE = f"{STATIC_ASSETS}/team"
 ICONS_URL_BASE = f"{STATIC_ASSETS}/icons"
 # Footer assets
 FOOTER_COST_URL = f"{STATIC_ASSETS}/footer/COST_LOGO_mediumgrey_transparentbackground.png"
@@ -162,6 +302,18 @@ CF_TURNSTILE = declare_component(
     url=f"{STATIC_ASSETS}/turnstile.html?v={APP_VERSION or 'dev'}"  # cache-bust via version
 )
 
+# Catalog search. "debounced": a search box above the results that sends its
+# value only after SEARCH_DEBOUNCE_MS of inactivity and reruns only the results
+# fragment. "sidebar": the classic text input (full rerun on Enter).
+# Either way, queries shorter than SEARCH_MIN_CHARS are ignored.
+SEARCH_MODE = os.getenv("SEARCH_MODE", "debounced").strip().lower()
+SEARCH_DEBOUNCE_MS = int(os.getenv("SEARCH_DEBOUNCE_MS", "300"))
+SEARCH_MIN_CHARS = int(os.getenv("SEARCH_MIN_CHARS", "3"))
+SEARCH_BOX = declare_component(
+    "search_box",
+    url=f"{STATIC_ASSETS}/search_box.html?v={APP_VERSION or 'dev'}"
+)
+
 
 st.markdown(
     """
@@ -576,6 +728,16 @@ st.markdown(
         .tool-detail-right h4{ margin-top: 6px; }
       }
 
+      /* --- Compare page --- */
+      .compare-wrap { overflow-x:auto; margin-top: 12px; }
+      table.compare { border-collapse:collapse; width:100%; font-size:0.95rem; }
+      table.compare th, table.compare td { border-bottom:1px solid #e6e6e6; padding:6px 10px; text-align:left; vertical-align:top; }
+      table.compare thead th { position:sticky; top:0; background:#fff; }
+      table.compare th.row-label { width:220px; font-weight:600; color:#444; }
+      table.compare tr.section th { background:#f5f5f5; color: var(--merlot-red); padding-top:10px; }
+      table.compare tr.differs td { background:#fff8e6; }
+      table.compare td.empty { color:#aaa; }
+
       /* ===== Mobile spacing tweaks: navbar + banner + content ===== */
       @media (max-width: 860px){
         /* Shorter fixed topbar, which also reduces the spacer below it */
@@ -1111,100 +1273,293 @@ def _flatten_for_csv(payload: dict) -> dict:
             flat[k] = sanitize_text(v if isinstance(v, str) else json.dumps(v, ensure_ascii=False))
     return flat
 
-def save_submission_files(tool_name: str, link: str, payload: dict) -> Path:
-    """
-    Write a pair of files to SUBMIT_DIR in a schema aligned with the master Excel:
-      - {timestamp}_{uuid}.csv  (flat, ordered columns)
-      - {same}.json             (full original payload for moderators)
-
-    NOTE: We intentionally do **not** store contact emails until a GDPR/cookie
-    policy is in place. See `suggest_page()` for the commented widget.
-    """
-    # Ensure directory exists and is writable; fall back to /tmp if needed
+# Ordered header matching the master Excel (placeholders stay empty if not provided)
+SUBMISSION_HEADERS = [
+    "submission_ref",
+    "tool_id",
+    "tool_name",
+    "link",
+    "tool_description",
+    "bullet1",
+    "bullet2",
+    "bullet3",
+    "user_groups",
+    "sectors",
+    "tool_types",
+    "target_scale_political",
+    "target_scale_physical",
+    "temporal_scale",
+    "temporal_resolution",
+    "methodological_approach",
+    "data_utilization",
+    "output_type",
+    "accessibility_and_usability",
+    "is_multi_language",
+    "languages",
+    "customizability",
+    "integration_capability",
+    "validation_and_reliability",
+    "cost",
+    "maintenance",
+    "support",
+    "primary_area_scope",
+    "primary_area_of_focus",
+    "notes",
+    # "contact_email",  # (GDPR/cookies pending) — intentionally omitted for now
+]
+
+# Journal tuning: a batch is written once it holds SUBMISSIONS_BATCH entries
+# or SUBMISSIONS_FLUSH_S after its first one; the open journal is closed
+# (renamed) once it exceeds SUBMISSIONS_ROTATE_BYTES or SUBMISSIONS_ROTATE_S.
+SUBMISSIONS_BATCH = int(os.getenv("SUBMISSIONS_BATCH", "50"))
+SUBMISSIONS_FLUSH_S = float(os.getenv("SUBMISSIONS_FLUSH_S", "1.0"))
+SUBMISSIONS_ROTATE_BYTES = int(os.getenv("SUBMISSIONS_ROTATE_BYTES", str(5 * 1024 * 1024)))
+SUBMISSIONS_ROTATE_S = int(os.getenv("SUBMISSIONS_ROTATE_S", "3600"))
+SUBMISSIONS_RETRY_S = 5.0        # pause between attempts to write a failed batch
+SUBMISSIONS_STOP_RETRIES = 3     # attempts left for a failed batch at shutdown
+
+
+def _writable_submit_dir(path: Path) -> Path:
+    """Probe `path` once; fall back to a container-local dir if it isn't writable."""
     try:
-        SUBMIT_DIR.mkdir(parents=True, exist_ok=True)
-        test_path = SUBMIT_DIR / ".writetest"
+        path.mkdir(parents=True, exist_ok=True)
+        test_path = path / ".writetest"
         with test_path.open("w") as _f:
             _f.write("ok")
-        try:
-            test_path.unlink(missing_ok=True)
-        except Exception:
-            pass
+        test_path.unlink(missing_ok=True)
+        return path
     except Exception:
-        # Final fallback inside the container
         fallback = Path("/tmp/adapt-tools-submissions").resolve()
         fallback.mkdir(parents=True, exist_ok=True)
-        globals()["SUBMIT_DIR"] = fallback  # redirect for this process
+        print(f"[submissions] {path} is not writable; using {fallback}")
+        return fallback
+
+
+def _journal_file(base: Path, ext: str) -> Path:
+    # not Path.with_suffix: host names may contain dots
+    return base.parent / (base.name + ext)
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, owned by someone else
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class SubmissionSink:
+    """
+    Queue + background writer for suggestions. Each process appends batches to
+    its own open journal pair in SUBMIT_DIR:
+      - _current-{host}-{pid}.jsonl  (full payload, one JSON object per line)
+      - _current-{host}-{pid}.csv    (flat row per submission, master-Excel order)
+    and closes it by atomic rename to submissions_{timestamp}_{host}-{pid}.{jsonl,csv}.
+    Only closed journals are meant to be picked up by moderators.
+    """
+
+    def __init__(self, directory: Path):
+        self.dir = directory
+        self.tag = f"{platform.node() or 'app'}-{os.getpid()}"
+        self._q: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._opened_at = 0.0
+        # Leading rows of the batch being retried that already reached the CSV;
+        # a retry only grows that batch at the end, so only the rest is appended
+        self._csv_done = 0
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "errors": 0, "rotations": 0,
+                      "last_flush_ms": 0.0}
+        # Journals left open by a dead process on this host are closed first;
+        # those of live sibling workers are theirs to rotate.
+        prefix = f"_current-{platform.node() or 'app'}-"
+        for stale in self.dir.glob(f"{prefix}*.jsonl"):
+            pid = stale.name[len(prefix): -len(".jsonl")]
+            if pid.isdigit() and int(pid) != os.getpid() and _pid_alive(int(pid)):
+                continue
+            self._close(stale.parent / stale.name[: -len(".jsonl")])
+        self._thread = threading.Thread(target=self._run, name="submission-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def _current(self) -> Path:
+        return self.dir / f"_current-{self.tag}"
+
+    def put(self, csv_row: dict, record: dict):
+        with self._lock:
+            self.stats["queued"] += 1
+        self._q.put((csv_row, record))
+
+    def pending(self) -> int:
+        return self._q.qsize()
+
+    def close(self, timeout: float = 5.0):
+        """Flush what is queued and close the open journal (registered with atexit)."""
+        if self._thread.is_alive():
+            self._q.put(None)
+            self._thread.join(timeout)
+        self._close(self._current)
+
+    def _run(self):
+        retry: list = []
+        while True:
+            try:
+                item = self._q.get(timeout=SUBMISSIONS_RETRY_S if retry else min(SUBMISSIONS_ROTATE_S, 60))
+            except queue.Empty:
+                if retry and self._write(retry):
+                    retry = []
+                if not retry:  # never split a half-written batch across journal pairs
+                    self._maybe_rotate()
+                continue
+            batch, stop = retry, item is None
+            if not stop:
+                batch.append(item)
+            deadline = time.monotonic() + SUBMISSIONS_FLUSH_S
+            while not stop and len(batch) < SUBMISSIONS_BATCH:
+                try:
+                    item = self._q.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            retry = [] if self._write(batch) else batch
+            if stop:
+                for _ in range(SUBMISSIONS_STOP_RETRIES):
+                    if not retry or self._write(retry):
+                        return
+                self._dump_unwritten(retry)
+                return
+
+    def _dump_unwritten(self, batch: list):
+        """Last resort at shutdown: put what could not be written into the log."""
+        print(f"[submissions] giving up on {len(batch)} submission(s); records follow")
+        for _, rec in batch:
+            print("[submissions] unwritten " + json.dumps(rec, ensure_ascii=False))
+
+    def _write(self, batch: list) -> bool:
+        if not batch:
+            return True
+        t0 = time.perf_counter()
+        base = self._current
+        try:
+            if not self._opened_at:
+                self._opened_at = time.time()
+            csv_path = _journal_file(base, ".csv")
+            new_csv = not csv_path.exists()
+            with csv_path.open("a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=SUBMISSION_HEADERS)
+                if new_csv:
+                    writer.writeheader()
+                writer.writerows(row for row, _ in batch[self._csv_done:])
+                f.flush()
+                os.fsync(f.fileno())
+            self._csv_done = len(batch)
+            with _journal_file(base, ".jsonl").open("a", encoding="utf-8") as f:
+                f.writelines(json.dumps(rec, ensure_ascii=False) + "\n" for _, rec in batch)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"[submissions] write failed ({len(batch)} queued for retry): {e}")
+            with self._lock:
+                self.stats["errors"] += 1
+            time.sleep(1.0)
+            return False
+        self._csv_done = 0
+        with self._lock:
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["last_flush_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+        self._maybe_rotate()
+        return True
+
+    def _maybe_rotate(self):
+        jsonl = _journal_file(self._current, ".jsonl")
+        if not jsonl.exists():
+            return
+        too_big = jsonl.stat().st_size >= SUBMISSIONS_ROTATE_BYTES
+        too_old = self._opened_at and time.time() - self._opened_at >= SUBMISSIONS_ROTATE_S
+        if too_big or too_old:
+            self._close(self._current)
+
+    def _close(self, base: Path):
+        """Rename an open journal pair to its final name (atomic on the same filesystem)."""
+        jsonl = _journal_file(base, ".jsonl")
+        if not jsonl.exists():
+            return
+        tag = base.name.removeprefix("_current-")
+        ts = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+        final = self.dir / f"submissions_{ts}_{tag}"
+        for ext in (".csv", ".jsonl"):  # JSONL last: its presence marks a complete pair
+            src = _journal_file(base, ext)
+            if src.exists():
+                os.replace(src, _journal_file(final, ext))
+        if base == self._current:
+            self._opened_at = 0.0
+        with self._lock:
+            self.stats["rotations"] += 1
+
+
+@st.cache_resource
+def get_submission_sink() -> SubmissionSink:
+    return SubmissionSink(_writable_submit_dir(SUBMIT_DIR))
+
+def save_submission_files(tool_name: str, link: str, payload: dict) -> str:
+    """
+    Queue one suggestion for the submission journal (see `SubmissionSink`) and
+    return its reference, `{timestamp}_{uuid}`. The CSV row follows the master
+    Excel column order; the JSONL record keeps the full original payload.
+
+    NOTE: We intentionally do **not** store contact emails until a GDPR/cookie
+    policy is in place. See `suggest_page()` for the commented widget.
+    """
     ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    uid = uuid.uuid4().hex[:8]
-    base = SUBMIT_DIR / f"{ts}_{uid}"
-
-    # Ordered header matching the master Excel (placeholders stay empty if not provided)
-    headers = [
-        "tool_id",
-        "tool_name",
-        "link",
-        "tool_description",
-        "bullet1",
-        "bullet2",
-        "bullet3",
-        "user_groups",
-        "sectors",
-        "tool_types",
-        "target_scale_political",
-        "target_scale_physical",
-        "temporal_scale",
-        "temporal_resolution",
-        "methodological_approach",
-        "data_utilization",
-        "output_type",
-        "accessibility_and_usability",
-        "is_multi_language",
-        "languages",
-        "customizability",
-        "integration_capability",
-        "validation_and_reliability",
-        "cost",
-        "maintenance",
-        "support",
-        "primary_area_scope",
-        "primary_area_of_focus",
-        "notes",
-        # "contact_email",  # (GDPR/cookies pending) — intentionally omitted for now
-    ]
+    ref = f"{ts}_{uuid.uuid4().hex[:8]}"
 
     # Flatten list-like fields for CSV (semicolon-delimited), clamp/clean text
     flat_payload = _flatten_for_csv({**payload, "tool_name": tool_name, "link": link})
 
     # Build a single ordered row; ensure missing keys exist with empty string
     row = {}
-    for key in headers:
-        if key == "tool_id":
+    for key in SUBMISSION_HEADERS:
+        if key == "submission_ref":
+            row[key] = ref
+        elif key == "tool_id":
             row[key] = ""  # new submissions don't set an ID
         else:
             row[key] = sanitize_text(flat_payload.get(key, ""))
 
-    # Write CSV
-    csv_path = base.with_suffix(".csv")
-    with csv_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        writer.writerow(row)
-
-    # Write JSON (verbatim payload without email for now)
-    json_path = base.with_suffix(".json")
-    with json_path.open("w", encoding="utf-8") as f:
-        json.dump({"tool_name": tool_name, "link": link, **payload}, f, ensure_ascii=False, indent=2)
-
-    return base
+    # JSON record (verbatim payload without email for now)
+    record = {"submission_ref": ref, "submitted_at": ts, "tool_name": tool_name, "link": link, **payload}
+    get_submission_sink().put(row, record)
+    get_pending_dup_index().add("pending", ref, tool_name, link)
+    return ref
+
+# ---------- CATALOG SOURCE ----------
+# Where the catalog loaders read their tables from:
+#   CATALOG_BACKEND=db        -> MySQL (default)
+#   CATALOG_BACKEND=snapshot  -> Arrow IPC files published by the importer into
+#                                CATALOG_SNAPSHOT_DIR (a volume shared by all
+#                                replicas), memory-mapped read-only. MySQL
+#                                credentials become optional in this mode.
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "db").strip().lower()
+CATALOG_SNAPSHOT_DIR = Path(os.getenv("CATALOG_SNAPSHOT_DIR", "/app/snapshot")).resolve()
 
 # ---------- DB CONNECTION ----------
-# Read credentials from environment (see .env / docker-compose.yml)
+# Read credentials from environment (see .env / docker-compose.yml).
+# DB_URL, if set, is a full SQLAlchemy URL that replaces the DB_* parts
+# (e.g. sqlite:///catalog.db as a local stand-in for benchmarks/dev).
+DB_URL = os.getenv("DB_URL", "")
+
 def _need(name: str) -> str:
     v = os.getenv(name)
-    if not v:
+    if not v and CATALOG_BACKEND != "snapshot" and not DB_URL:
         raise RuntimeError(f"Missing required environment variable: {name}")
-    return v
+    return v or ""
 
 DB_USER = _need("DB_USER")
 DB_PASSWORD = _need("DB_PASSWORD")
@@ -1212,7 +1567,7 @@ DB_HOST = os.getenv("DB_HOST", "mysql")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = _need("DB_NAME")
 
-db_url = URL.create(
+db_url = DB_URL or URL.create(
     drivername="mysql+pymysql",
     username=DB_USER,
     password=DB_PASSWORD,
@@ -1220,17 +1575,562 @@ db_url = URL.create(
     port=int(DB_PORT) if str(DB_PORT).isdigit() else None,
     database=DB_NAME,
 )
-engine = create_engine(db_url, pool_pre_ping=True)
+
+# Pool sizing (overridable in .env). MySQL drops idle connections after
+# `wait_timeout` (8h by default), so recycling connections well before that
+# keeps the pool healthy without a pre-ping round-trip on every checkout.
+# Set DB_POOL_PRE_PING=1 if something in between (proxy, NAT) cuts idle
+# connections sooner than the recycle window.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+DB_POOL_TIMEOUT_S = int(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0").strip().lower() in ("1", "true", "yes")
+
+
+class PoolStats:
+    """Process-wide counters for pool checkouts (shared by all sessions)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+
+    def record_checkout(self, wait_s: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_s += wait_s
+            self.wait_max_s = max(self.wait_max_s, wait_s)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> dict:
+        """Current pool utilisation plus the accumulated wait statistics."""
+        with self._lock:
+            avg_ms = (self.wait_total_s / self.checkouts * 1000.0) if self.checkouts else 0.0
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(avg_ms, 3),
+                "wait_max_ms": round(self.wait_max_s * 1000.0, 3),
+            }
+        # QueuePool exposes its live counters; other pool classes may not
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            fn = getattr(pool, name, None)
+            stats[name] = fn() if callable(fn) else None
+        return stats
+
+
+def plain_logger(name: str) -> logging.Logger:
+    """Logger that writes bare messages (JSON lines) to stderr, outside Streamlit's format."""
+    log = logging.getLogger(name)
+    if not log.handlers:
+        h = logging.StreamHandler()
+        h.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(h)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    return log
+
+
+# Query profiling (SQL_PROFILE=1): duration, row count and call site of every
+# statement on the shared engine. Statements slower than SLOW_QUERY_MS are
+# logged on `adapt_tools.sql`; the rolling summary is shown on ?page=_perf.
+SQL_PROFILE = os.getenv("SQL_PROFILE", "0").strip().lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+sql_log = plain_logger("adapt_tools.sql")
+
+def _statement_key(statement: str) -> str:
+    return " ".join(statement.split())[:200]
+
+def _call_site() -> str:
+    """First frame in this file above the DB helpers, e.g. `load_tools:1530`."""
+    skip = {"read_sql", "read_table", "_call_site", "_after_cursor_execute"}
+    f = sys._getframe(1)
+    while f is not None:
+        if f.f_code.co_filename == __file__ and f.f_code.co_name not in skip:
+            return f"{f.f_code.co_name}:{f.f_lineno}"
+        f = f.f_back
+    return "?"
+
+class QueryProfiler:
+    """Per-statement aggregates plus the most recent statements (shared by all sessions)."""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, recent: int = 200):
+        self._lock = threading.Lock()
+        self.slow_s = slow_ms / 1000.0
+        self._stats: dict[tuple[str, str], dict] = {}
+        self.recent: deque = deque(maxlen=recent)
+
+    def record(self, statement: str, seconds: float, rows: int, site: str):
+        key = (site, _statement_key(statement))
+        with self._lock:
+            agg = self._stats.setdefault(key, {"calls": 0, "rows": 0, "total_s": 0.0, "max_s": 0.0, "slow": 0})
+            agg["calls"] += 1
+            agg["rows"] += max(rows, 0)
+            agg["total_s"] += seconds
+            agg["max_s"] = max(agg["max_s"], seconds)
+            if seconds >= self.slow_s:
+                agg["slow"] += 1
+            self.recent.append({"site": site, "ms": round(seconds * 1000.0, 3), "rows": rows, "sql": key[1]})
+        if seconds >= self.slow_s:
+            sql_log.warning(json.dumps({
+                "event": "slow_query",
+                "ts": datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+                "site": site,
+                "ms": round(seconds * 1000.0, 3),
+                "rows": rows,
+                "sql": key[1],
+            }, ensure_ascii=False))
+
+    def summary(self, top: int = 25) -> list[dict]:
+        with self._lock:
+            rows = [
+                {
+                    "site": site,
+                    "sql": sql,
+                    "calls": a["calls"],
+                    "rows": a["rows"],
+                    "slow": a["slow"],
+                    "total_ms": round(a["total_s"] * 1000.0, 2),
+                    "avg_ms": round(a["total_s"] / a["calls"] * 1000.0, 3),
+                    "max_ms": round(a["max_s"] * 1000.0, 2),
+                }
+                for (site, sql), a in self._stats.items()
+            ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)[:top]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.recent.clear()
+
+def attach_query_profiler(eng, profiler: QueryProfiler):
+    """Time every cursor execution on `eng` (standard before/after_cursor_execute recipe)."""
+    @event.listens_for(eng, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_t0", []).append(time.perf_counter())
+
+    @event.listens_for(eng, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        dt = time.perf_counter() - conn.info["query_t0"].pop()
+        site = _call_site()
+        profiler.record(statement, dt, cursor.rowcount, site)
+        if METRICS_ENABLED:
+            get_metrics().observe("adapt_tools_sql_seconds", dt, {"site": site.split(":")[0]})
+
+    @event.listens_for(eng, "handle_error")
+    def _handle_error(ctx):
+        starts = ctx.connection.info.get("query_t0") if ctx.connection is not None else None
+        if starts:
+            starts.pop()
+
+@st.cache_resource
+def get_query_profiler() -> QueryProfiler:
+    return QueryProfiler()
+
+
+# Streamlit re-executes this script on every rerun, so the engine (and its
+# pool) must be a cached resource; otherwise each rerun builds a fresh pool.
+@st.cache_resource
+def get_engine():
+    eng = create_engine(
+        db_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE_S,
+        pool_timeout=DB_POOL_TIMEOUT_S,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    if SQL_PROFILE:
+        attach_query_profiler(eng, get_query_profiler())
+    return eng
+
+@st.cache_resource
+def get_pool_stats() -> PoolStats:
+    return PoolStats()
+
+engine = get_engine()
+
+
+def read_sql(sql: str) -> pd.DataFrame:
+    """`pd.read_sql` on a pooled connection, recording how long the checkout waited."""
+    stats = get_pool_stats()
+    t0 = time.perf_counter()
+    try:
+        con = engine.connect()
+    except SATimeoutError:
+        stats.record_timeout()
+        raise
+    stats.record_checkout(time.perf_counter() - t0)
+    with con:
+        return pd.read_sql(sql, con)
+
+
+# ---------- CATALOG BACKEND ----------
+# The loaders below keep their st.cache_data layer on top of either source.
+def snapshot_dir() -> Path | None:
+    """Directory of the live snapshot version (named in CATALOG_SNAPSHOT_DIR/CURRENT)."""
+    try:
+        name = (CATALOG_SNAPSHOT_DIR / "CURRENT").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    d = CATALOG_SNAPSHOT_DIR / name
+    return d if name and d.is_dir() else None
+
+def load_snapshot_manifest() -> dict | None:
+    """manifest.json of the live snapshot (version, created_at, row counts), if any."""
+    d = snapshot_dir()
+    if d is None:
+        return None
+    try:
+        return json.loads((d / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def read_snapshot_table(table_name: str, columns: list[str] | None = None) -> pd.DataFrame | None:
+    """Memory-map `{table_name}.arrow` from the live snapshot; None if it is missing."""
+    d = snapshot_dir()
+    path = d / f"{table_name}.arrow" if d is not None else None
+    if path is None or not path.exists():
+        return None
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as src:
+        tbl = pa.ipc.open_file(src).read_all()
+    if columns:
+        tbl = tbl.select(columns)
+    return tbl.to_pandas()
+
+def read_table(table_name: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Read a whole catalog table (optionally a subset of columns) from the configured backend."""
+    if CATALOG_BACKEND == "snapshot":
+        df = read_snapshot_table(table_name, columns)
+        if df is not None:
+            return df
+        print(f"[catalog] snapshot table {table_name!r} not found under {CATALOG_SNAPSHOT_DIR}; reading from MySQL")
+    cols = ", ".join(f"`{c}`" for c in columns) if columns else "*"
+    return read_sql(f"SELECT {cols} FROM `{table_name}`")
+
+
+# ---------- PERF TRACING ----------
+# Opt-in (PERF_TRACE=1): wall time and call counts for the hot path, with
+# st.cache_data hits and misses counted separately. Every rerun is logged as
+# one JSON line on the `adapt_tools.perf` logger; aggregates are shown on the
+# internal ?page=_perf view.
+PERF_TRACE = os.getenv("PERF_TRACE", "0").strip().lower() in ("1", "true", "yes")
+
+perf_log = plain_logger("adapt_tools.perf")
+
+class PerfRegistry:
+    """Process-wide aggregates per span name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: dict[str, dict] = {}
+
+    def record(self, name: str, seconds: float, cache: str | None = None):
+        with self._lock:
+            agg = self._spans.setdefault(
+                name, {"calls": 0, "hits": 0, "misses": 0, "total_s": 0.0, "max_s": 0.0}
+            )
+            agg["calls"] += 1
+            agg["total_s"] += seconds
+            agg["max_s"] = max(agg["max_s"], seconds)
+            if cache == "hit":
+                agg["hits"] += 1
+            elif cache == "miss":
+                agg["misses"] += 1
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            rows = [
+                {
+                    "span": name,
+                    "calls": a["calls"],
+                    "cache_hits": a["hits"],
+                    "cache_misses": a["misses"],
+                    "total_ms": round(a["total_s"] * 1000.0, 2),
+                    "avg_ms": round(a["total_s"] / a["calls"] * 1000.0, 3),
+                    "max_ms": round(a["max_s"] * 1000.0, 2),
+                }
+                for name, a in self._spans.items()
+            ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+
+@st.cache_resource
+def get_perf_registry() -> PerfRegistry:
+    return PerfRegistry()
+
+# Per script-thread state: spans of the current rerun and a cache-miss counter
+_trace_local = threading.local()
+
+def mark_cache_miss():
+    """Call first thing in a cached loader body; it only runs when st.cache_data misses."""
+    _trace_local.misses = getattr(_trace_local, "misses", 0) + 1
+
+@contextmanager
+def perf_span(name: str, cached: bool = False):
+    """Time a block. With `cached=True`, classify it as a cache hit or miss."""
+    if not (PERF_TRACE or METRICS_ENABLED):
+        yield
+        return
+    misses_before = getattr(_trace_local, "misses", 0)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        cache = None
+        if cached:
+            cache = "miss" if getattr(_trace_local, "misses", 0) > misses_before else "hit"
+        if PERF_TRACE:
+            get_perf_registry().record(name, dt, cache)
+            spans = getattr(_trace_local, "spans", None)
+            if spans is not None:
+                spans.append({"span": name, "ms": round(dt * 1000.0, 3), **({"cache": cache} if cache else {})})
+        if METRICS_ENABLED:
+            m = get_metrics()
+            m.observe("adapt_tools_span_seconds", dt, {"span": name})
+            if cache:
+                m.inc("adapt_tools_cache_requests_total", {"loader": name, "result": cache})
+
+def traced(name: str, cached: bool = False, by_arg: bool = False):
+    """Decorator form of `perf_span`; `by_arg` appends the first argument to the span name."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            span = f"{name}[{args[0]}]" if by_arg and args else name
+            with perf_span(span, cached=cached):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def log_rerun(page: str, seconds: float):
+    """Emit one structured log line for the rerun that just finished."""
+    spans = getattr(_trace_local, "spans", None) or []
+    get_perf_registry().record(f"rerun[{page}]", seconds)
+    entry = {
+        "event": "rerun",
+        "ts": datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+        "page": page,
+        "ms": round(seconds * 1000.0, 3),
+        "spans": spans,
+    }
+    st.session_state["perf_last_rerun"] = entry
+    perf_log.info(json.dumps(entry, ensure_ascii=False))
+
+
+# ---------- METRICS ----------
+# Prometheus text format on a small sidecar HTTP server inside the app process
+# (METRICS_PORT; disabled when empty). It is not proxied by Nginx: scrape it
+# on the compose network, e.g. http://app:9102/metrics.
+METRICS_PORT = os.getenv("METRICS_PORT", "").strip()
+METRICS_BIND = os.getenv("METRICS_BIND", "0.0.0.0")
+METRICS_ENABLED = METRICS_PORT.isdigit()
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_HELP = {
+    "adapt_tools_page_views_total": ("counter", "Page views (first rerun of a page in a session)."),
+    "adapt_tools_reruns_total": ("counter", "Script reruns by page."),
+    "adapt_tools_rerun_seconds": ("histogram", "Wall time of a full script rerun by page."),
+    "adapt_tools_span_seconds": ("histogram", "Wall time of traced loaders, filters and rendering."),
+    "adapt_tools_cache_requests_total": ("counter", "st.cache_data lookups per loader, by hit/miss."),
+    "adapt_tools_filter_cache_requests_total": ("counter", "Filter result cache lookups, by hit/miss."),
+    "adapt_tools_submission_write_seconds": ("histogram", "Time to hand one suggestion to the journal queue."),
+    "adapt_tools_submissions_pending": ("gauge", "Suggestions queued but not yet written."),
+    "adapt_tools_submissions_written_total": ("counter", "Suggestions written to the journal."),
+    "adapt_tools_submission_write_errors_total": ("counter", "Failed journal writes (batch retried)."),
+    "adapt_tools_turnstile_verify_seconds": ("histogram", "Turnstile siteverify round-trip time."),
+    "adapt_tools_turnstile_verifications_total": ("counter", "Turnstile verifications, by result."),
+    "adapt_tools_sql_seconds": ("histogram", "SQL statement time by calling function (SQL_PROFILE=1)."),
+    "adapt_tools_rate_limited_total": ("counter", "Form submits rejected by the per-client rate limit."),
+    "adapt_tools_db_pool_connections": ("gauge", "DB pool connections by state."),
+    "adapt_tools_db_pool_checkouts_total": ("counter", "DB pool checkouts."),
+    "adapt_tools_db_pool_timeouts_total": ("counter", "DB pool checkouts that timed out."),
+    "adapt_tools_db_pool_wait_seconds_total": ("counter", "Total time spent waiting for a pooled connection."),
+}
+
+def _labels(labels: dict | None) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in sorted(labels.items())) + "}"
+
+class Metrics:
+    """Process-wide counters and histograms keyed by (name, labels)."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS_S):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self._counters: dict[tuple[str, str], float] = {}
+        # key -> [count per bucket..., sum, count]
+        self._hists: dict[tuple[str, str], list[float]] = {}
+
+    def inc(self, name: str, labels: dict | None = None, value: float = 1.0):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, labels: dict | None = None):
+        key = (name, _labels(labels))
+        with self._lock:
+            h = self._hists.get(key)
+            if h is None:
+                h = self._hists[key] = [0.0] * (len(self.buckets) + 2)
+            for i, le in enumerate(self.buckets):
+                if seconds <= le:
+                    h[i] += 1
+            h[-2] += seconds
+            h[-1] += 1
+
+    def render(self, extra: list[tuple[str, dict, float]] = ()) -> str:
+        """Exposition text; `extra` carries values read at scrape time (gauges, pool counters)."""
+        with self._lock:
+            samples: dict[str, list[str]] = {}
+            for (name, lbl), v in self._counters.items():
+                samples.setdefault(name, []).append(f"{name}{lbl} {v:g}")
+            for (name, lbl), h in self._hists.items():
+                inner = lbl[1:-1] + "," if lbl else ""
+                out = samples.setdefault(name, [])
+                for le, n in zip(self.buckets, h):
+                    out.append(f'{name}_bucket{{{inner}le="{le:g}"}} {n:g}')
+                out.append(f'{name}_bucket{{{inner}le="+Inf"}} {h[-1]:g}')
+                out.append(f"{name}_sum{lbl} {h[-2]:.6f}")
+                out.append(f"{name}_count{lbl} {h[-1]:g}")
+        for name, labels, v in extra:
+            samples.setdefault(name, []).append(f"{name}{_labels(labels)} {v:g}")
+
+        lines = []
+        for name in sorted(samples):
+            kind, help_text = METRIC_HELP.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples[name])
+        return "\n".join(lines) + "\n"
+
+@st.cache_resource
+def get_metrics() -> Metrics:
+    return Metrics()
+
+@contextmanager
+def observe_latency(name: str, **labels):
+    """Time a block into histogram `name` (no-op unless METRICS_PORT is set)."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_metrics().observe(name, time.perf_counter() - t0, labels)
+
+def record_rerun(page: str, seconds: float):
+    m = get_metrics()
+    m.inc("adapt_tools_reruns_total", {"page": page})
+    m.observe("adapt_tools_rerun_seconds", seconds, {"page": page})
+    if st.session_state.get("metrics_page") != page:
+        st.session_state["metrics_page"] = page
+        m.inc("adapt_tools_page_views_total", {"page": page})
+
+def _scrape_time_samples(pool_stats: PoolStats, pool, filter_cache, sink) -> list[tuple[str, dict, float]]:
+    """Pool and filter-cache state, read when Prometheus scrapes."""
+    out = []
+    stats = pool_stats.snapshot(pool)
+    for state in ("checkedout", "checkedin", "overflow", "size"):
+        if stats[state] is not None:
+            out.append(("adapt_tools_db_pool_connections", {"state": state}, stats[state]))
+    out.append(("adapt_tools_db_pool_checkouts_total", {}, stats["checkouts"]))
+    out.append(("adapt_tools_db_pool_timeouts_total", {}, stats["timeouts"]))
+    out.append(("adapt_tools_db_pool_wait_seconds_total", {}, pool_stats.wait_total_s))
+    fc = filter_cache.stats()
+    out.append(("adapt_tools_filter_cache_requests_total", {"result": "hit"}, fc["hits"]))
+    out.append(("adapt_tools_filter_cache_requests_total", {"result": "miss"}, fc["misses"]))
+    out.append(("adapt_tools_submissions_pending", {}, sink.pending()))
+    out.append(("adapt_tools_submissions_written_total", {}, sink.stats["written"]))
+    out.append(("adapt_tools_submission_write_errors_total", {}, sink.stats["errors"]))
+    return out
+
+class SidecarHandler(BaseHTTPRequestHandler):
+    """Base for the small HTTP servers the app runs next to Streamlit."""
+
+    def reply(self, body: bytes, content_type: str, cache: str | None = None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if cache:
+            self.send_header("Cache-Control", cache)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # keep scrapes/lookups out of the app log
+        pass
+
+def serve_sidecar(name: str, bind: str, port: int, handler: type[SidecarHandler]):
+    """Run `handler` on bind:port in a daemon thread; None if the port can't be bound."""
+    try:
+        server = ThreadingHTTPServer((bind, port), handler)
+    except OSError as e:
+        print(f"[{name}] could not bind {bind}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"{name}-server", daemon=True).start()
+    return server
+
+@st.cache_resource
+def start_metrics_server():
+    """Serve /metrics from a daemon thread; one per process, shared by all sessions."""
+    # Resolve the shared objects here, on the script thread; the server thread
+    # has no script run context to look up cached resources with.
+    metrics, pool_stats, pool = get_metrics(), get_pool_stats(), engine.pool
+    filter_cache, sink = get_filter_cache(), get_submission_sink()
+
+    class Handler(SidecarHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render(_scrape_time_samples(pool_stats, pool, filter_cache, sink)).encode("utf-8")
+            self.reply(body, "text/plain; version=0.0.4; charset=utf-8")
+
+    server = serve_sidecar("metrics", METRICS_BIND, int(METRICS_PORT), Handler)
+    if server is not None:
+        print(f"[metrics] serving http://{METRICS_BIND}:{METRICS_PORT}/metrics")
+    return server
 
 
 # ---------- DATA LOADERS ----------
+def _is_text(col: pd.Series) -> bool:
+    return col.dtype == object or isinstance(col.dtype, pd.CategoricalDtype)
+
+def codes_isin(col: pd.Series, values) -> np.ndarray:
+    """
+    Boolean mask of `col` in `values`. Categorical columns are compared on their
+    integer codes (the wanted labels are looked up once in the facet vocabulary).
+    """
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        return col.isin(values).to_numpy()
+    wanted = col.cat.categories.get_indexer(list(values))
+    return np.isin(col.cat.codes.to_numpy(), wanted[wanted >= 0])
+
+@traced("load_tools", cached=True)
 @st.cache_data(ttl=300)
 def load_tools() -> pd.DataFrame:
     """
     Loads the new Tools schema (post Excel import) and provides snake_case aliases
     used by the UI.
     """
-    df = pd.read_sql("SELECT * FROM Tools", engine)
+    mark_cache_miss()
+    df = read_table("Tools")
 
     # Normalize to the short names the UI expects
     rename_map = {
@@ -1267,13 +2167,16 @@ def load_tools() -> pd.DataFrame:
     return df
 
 
+@traced("load_filter_table", cached=True, by_arg=True)
 @st.cache_data(ttl=300)
 def load_filter_table(table_name: str) -> pd.DataFrame:
     """
-    Load any Tool_* mapping table and return (tool_id, label).
+    Load any Tool_* mapping table and return (tool_id, label), with `label`
+    as a pandas Categorical (one shared vocabulary per facet).
     Works with the new normalized tables.
     """
-    df = pd.read_sql(f"SELECT * FROM `{table_name}`", engine)
+    mark_cache_miss()
+    df = read_table(table_name)
 
     # find tool_id
     cand_ids = [c for c in df.columns if c.lower().replace(" ", "").replace("_", "") in ("toolid", "toolid", "tool_id")]
@@ -1281,7 +2184,7 @@ def load_filter_table(table_name: str) -> pd.DataFrame:
 
     # choose a text column for label
     exclude = set([tool_id_col.lower(), "id", "tool_id", "Tool ID".lower()])
-    text_cols = [c for c in df.columns if c.lower() not in exclude and df[c].dtype == object]
+    text_cols = [c for c in df.columns if c.lower() not in exclude and _is_text(df[c])]
     label_col = text_cols[0] if text_cols else [c for c in df.columns if c != tool_id_col][0]
 
     out = df[[tool_id_col, label_col]].copy()
@@ -1296,14 +2199,16 @@ def load_filter_table(table_name: str) -> pd.DataFrame:
     out = out.dropna(subset=["label"])
     out = out[out["label"] != ""]
     out = out.drop_duplicates()
+    # Labels repeat across thousands of link rows: store them once per facet
+    out["label"] = out["label"].astype("category")
     return out
 
 @st.cache_data(ttl=300)
 def options_from_tools_column(col_name: str) -> list[str]:
     """Return distinct non-empty values from a Tools table column."""
-    df = pd.read_sql(f"SELECT DISTINCT `{col_name}` AS val FROM Tools", engine)
+    df = read_table("Tools", [col_name])
     vals = (
-        df["val"]
+        df[col_name]
         .dropna()
         .astype(str)
         .str.strip()
@@ -1315,54 +2220,28 @@ def options_from_tools_column(col_name: str) -> list[str]:
     vals = sorted(vals, key=lambda x: x.lower())
     return vals
 
+@traced("load_area_table", cached=True)
 @st.cache_data(ttl=300)
 def load_area_table() -> pd.DataFrame:
     """
-    Return areas as columns: tool_id (Int64), scope (str), name (str).
-
-    Supports two Tool_Area schemas:
-      1) New:    tool_id, scope, name
-      2) Legacy: tool_id, label  (name only)  → join Tools to get primary_area_scope as scope
+    Return areas as columns: tool_id (Int64), scope (category), name (category).
+    Both Tool_Area schemas are supported (see catalog_schema.area_pairs).
     """
-    a = pd.read_sql("SELECT * FROM `Tool_Area`", engine)
-    cols = {c.lower(): c for c in a.columns}
-
-    if {"tool_id", "scope", "name"}.issubset(cols):
-        out = a[[cols["tool_id"], cols["scope"], cols["name"]]].copy()
-        out.columns = ["tool_id", "scope", "name"]
-
-    elif "tool_id" in cols and "label" in cols:
-        # legacy: use label for name, fetch scope from Tools
-        t = pd.read_sql("SELECT tool_id, primary_area_scope FROM `Tools`", engine)
-        out = a[[cols["tool_id"], cols["label"]]].copy()
-        out.columns = ["tool_id", "name"]
-        out = out.merge(t, on="tool_id", how="left").rename(columns={"primary_area_scope": "scope"})
-
-    else:
-        # last-resort best effort: try to infer two text columns
-        str_cols = [c for c in a.columns if a[c].dtype == object]
-        if "tool_id" in a.columns and len(str_cols) >= 2:
-            out = a[["tool_id", str_cols[0], str_cols[1]]].copy()
-            out.columns = ["tool_id", "scope", "name"]
-        else:
-            raise ValueError(f"Tool_Area has unsupported columns: {list(a.columns)}")
-
-    # normalize
-    out["tool_id"] = pd.to_numeric(out["tool_id"], errors="coerce").astype("Int64")
-    out["scope"] = out["scope"].astype(str).str.strip()
-    out["name"]  = out["name"].astype(str).str.strip()
-    out = out.dropna(subset=["tool_id"])
-    out = out[(out["scope"] != "") & (out["name"] != "")]
-    out = out.drop_duplicates()
+    mark_cache_miss()
+    out = area_pairs(read_table("Tool_Area"), lambda: read_table("Tools", ["tool_id", "primary_area_scope"]))
+    out["scope"] = out["scope"].astype("category")
+    out["name"] = out["name"].astype("category")
     return out
 
 
+@traced("load_badge_maps", cached=True)
 @st.cache_data(ttl=300)
 def load_badge_maps() -> dict[str, dict[int, list[str]]]:
     """
     Return a dict keyed by badge group with {tool_id -> [labels]} maps:
       - sector, tool_type, scale_political, output_type
     """
+    mark_cache_miss()
     maps: dict[str, dict[int, list[str]]] = {}
     def make_map(table: str) -> dict[int, list[str]]:
         df = load_filter_table(table)
@@ -1377,6 +2256,87 @@ def load_badge_maps() -> dict[str, dict[int, list[str]]]:
     maps["user_group"] = make_map("Tool_UserGroup")
     return maps
 
+@st.cache_data(ttl=300)
+def catalog_version() -> str:
+    """
+    Identifier of the catalog being served; changes whenever the importer
+    rebuilds it. Used to key caches that outlive a single loader call.
+    """
+    if CATALOG_BACKEND == "snapshot":
+        manifest = load_snapshot_manifest()
+        if manifest and manifest.get("version"):
+            return str(manifest["version"])
+    df = read_sql("SELECT COUNT(*) AS n, MAX(updated_at) AS u FROM Tools")
+    return f"db-{int(df['n'].iloc[0])}-{df['u'].iloc[0]}"
+
+# ---------- GEOGRAPHY INDEX ----------
+# Area Scope / Area (Names) cascade and filter on (scope, name) pairs. The
+# pairs are indexed once per catalog version so both become dict lookups:
+# scope -> sorted names, (scope, name) -> tool ids, name -> tool ids.
+# The snapshot ships it prebuilt (geo_index.json, Tool_Area schema resolved
+# by the importer); the DB backend builds it from load_area_table().
+def _lower_sorted(values) -> tuple[str, ...]:
+    return tuple(sorted(set(values), key=lambda x: x.lower()))
+
+class GeoIndex:
+    """Read-only lookups over (scope, name, tool_ids) triples; shared by all sessions."""
+
+    def __init__(self, pairs):
+        by_pair: dict[tuple[str, str], set[int]] = {}
+        for scope, name, ids in pairs:
+            by_pair.setdefault((scope, name), set()).update(int(i) for i in ids)
+        self.by_pair = {k: frozenset(v) for k, v in by_pair.items()}
+
+        by_scope: dict[str, set[int]] = {}
+        by_name: dict[str, set[int]] = {}
+        names: dict[str, set[str]] = {}
+        for (scope, name), ids in self.by_pair.items():
+            by_scope.setdefault(scope, set()).update(ids)
+            by_name.setdefault(name, set()).update(ids)
+            names.setdefault(scope, set()).add(name)
+        self.ids_by_scope = {k: frozenset(v) for k, v in by_scope.items()}
+        self.ids_by_name = {k: frozenset(v) for k, v in by_name.items()}
+        self.names_by_scope = {k: _lower_sorted(v) for k, v in names.items()}
+        self.scopes = _lower_sorted(self.ids_by_scope)
+        self.all_names = _lower_sorted(self.ids_by_name)
+
+    @classmethod
+    def from_area_table(cls, area_df: pd.DataFrame) -> "GeoIndex":
+        grouped = area_df.groupby(["scope", "name"], observed=True)["tool_id"]
+        return cls((str(s), str(n), ids.dropna().astype(int).tolist()) for (s, n), ids in grouped)
+
+    def names_for(self, scopes) -> tuple[str, ...]:
+        """Area name options, cascaded by the selected scopes (all names if none)."""
+        if not scopes:
+            return self.all_names
+        if len(scopes) == 1:
+            return self.names_by_scope.get(next(iter(scopes)), ())
+        return _lower_sorted(n for s in scopes for n in self.names_by_scope.get(s, ()))
+
+    def tool_ids(self, scopes, areas) -> set[int]:
+        """Tools with an area row matching the selected scopes AND names."""
+        if scopes and areas:
+            keys = ((s, n) for s in scopes for n in areas)
+            return set().union(*(self.by_pair.get(k, ()) for k in keys))
+        if scopes:
+            return set().union(*(self.ids_by_scope.get(s, ()) for s in scopes))
+        return set().union(*(self.ids_by_name.get(n, ()) for n in areas))
+
+    def stats(self) -> dict:
+        return {"scopes": len(self.scopes), "names": len(self.all_names), "pairs": len(self.by_pair)}
+
+@st.cache_resource(max_entries=2)
+def get_geo_index(version: str) -> GeoIndex:
+    """Geography index for catalog `version`."""
+    d = snapshot_dir() if CATALOG_BACKEND == "snapshot" else None
+    if d is not None and (d / "geo_index.json").exists():
+        try:
+            data = json.loads((d / "geo_index.json").read_text(encoding="utf-8"))
+            return GeoIndex(data["pairs"])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[catalog] unreadable geo_index.json in {d}: {e}; rebuilding")
+    return GeoIndex.from_area_table(load_area_table())
+
 # Map sidebar sections -> table names (NEW SCHEMA)
 # ---------- FILTER SECTIONS (grouped) ----------
 # Mapping-table filters (tables that look like: tool_id, label)
@@ -1450,6 +2410,306 @@ SECTIONS = {
     ],
 }
 
+def sidebar_option_list(ref: str) -> tuple[str, ...]:
+    """Options for one sidebar filter: a Tools column or a Tool_* table."""
+    if ref in TOOLS_VALUE_COLS.values():
+        return tuple(options_from_tools_column(ref))
+    return tuple(sorted(load_filter_table(ref)["label"].dropna().unique().tolist()))
+
+@st.cache_resource(max_entries=2)
+def get_sidebar_options(version: str) -> dict[str, tuple[str, ...]]:
+    """
+    Option list per sidebar filter label for catalog `version`, built once so a
+    rerun renders the sidebar from lookups instead of reloading and re-sorting
+    every Tool_* table. Labels whose source failed are left out, so the sidebar
+    retries them on the next run instead of caching the error.
+    """
+    out: dict[str, tuple[str, ...]] = {}
+    for items in SECTIONS.values():
+        for label, ref in items:
+            if not isinstance(ref, str) or ref.startswith("_"):
+                continue
+            try:
+                out[label] = sidebar_option_list(ref)
+            except Exception:
+                continue
+    return out
+
+# ---------- TYPEAHEAD ----------
+# Prefix suggestions over tool names, every Tool_* facet label and the area
+# names, answered at /api/typeahead by a small HTTP server of its own
+# (TYPEAHEAD_PORT; no Streamlit rerun).
+# Each field is a sorted array of lowercased keys searched with bisect: one
+# array for whole-value prefixes ("flo" -> "Flood…") and one for word starts
+# inside a value ("risk" -> "Coastal Flood Risk"), whole-value hits first.
+# Fields are named like the URL filter params: "search" (tool names),
+# "languages", "area_names", …
+# TYPEAHEAD_URL is where the browser reaches it (nginx proxies /api/typeahead
+# to the sidecar); empty disables suggestions in the search box.
+TYPEAHEAD_PORT = os.getenv("TYPEAHEAD_PORT", "").strip()
+TYPEAHEAD_BIND = os.getenv("TYPEAHEAD_BIND", "0.0.0.0")
+TYPEAHEAD_ENABLED = TYPEAHEAD_PORT.isdigit()
+TYPEAHEAD_K = int(os.getenv("TYPEAHEAD_K", "8"))
+TYPEAHEAD_URL = os.getenv("TYPEAHEAD_URL", "/api/typeahead" if TYPEAHEAD_ENABLED else "").strip()
+TYPEAHEAD_MAX_K = 50
+_WORD_START = re.compile(r"(?<!\w)\w")
+
+class TypeaheadIndex:
+    """Read-only sorted (key, value) arrays per field; shared by all sessions and the sidecar."""
+
+    def __init__(self, fields: dict[str, list[str]]):
+        self.fields: dict[str, tuple[list[str], list[str], list[str], list[str]]] = {}
+        for field, values in fields.items():
+            uniq = {v.strip() for v in values if isinstance(v, str) and v.strip()}
+            whole = sorted((v.lower(), v) for v in uniq)
+            words = sorted(
+                (low[m.start():], v)
+                for v, low in ((v, v.lower()) for v in uniq)
+                for m in _WORD_START.finditer(low) if m.start() > 0
+            )
+            self.fields[field] = ([k for k, _ in whole], [v for _, v in whole],
+                                  [k for k, _ in words], [v for _, v in words])
+
+    def suggest(self, field: str, prefix: str, k: int = TYPEAHEAD_K) -> list[str]:
+        """Up to `k` values of `field` starting with `prefix` (or with a word that does)."""
+        arrays = self.fields.get(field)
+        q = (prefix or "").strip().lower()
+        if arrays is None or not q or k <= 0:
+            return []
+        out: list[str] = []
+        seen: set[str] = set()
+        for keys, values in (arrays[0:2], arrays[2:4]):
+            i = bisect.bisect_left(keys, q)
+            while i < len(keys) and len(out) < k and keys[i].startswith(q):
+                if values[i] not in seen:
+                    seen.add(values[i])
+                    out.append(values[i])
+                i += 1
+        return out
+
+    def stats(self) -> dict:
+        return {f: len(a[1]) for f, a in self.fields.items()}
+
+def build_typeahead_index(version: str) -> TypeaheadIndex:
+    fields = {SEARCH_PARAM: load_tools()["tool_name"].dropna().astype(str).tolist()}
+    for label, table in MAP_TABLES.items():
+        try:
+            fields[_slug(label)] = load_filter_table(table)["label"].dropna().astype(str).tolist()
+        except Exception as e:
+            print(f"[typeahead] skipped {label}: {e}")
+    fields[AREA_NAMES_PARAM] = list(get_geo_index(version).all_names)
+    return TypeaheadIndex(fields)
+
+class TypeaheadHolder:
+    """
+    The index for the catalog version served right now. Script runs swap it in
+    (cached loaders only work on the script thread); the server thread just
+    reads `index`.
+    """
+
+    def __init__(self):
+        self.version: str | None = None
+        self.index: TypeaheadIndex | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self, version: str) -> None:
+        if version == self.version:
+            return
+        with self._lock:
+            if version != self.version:
+                self.index = build_typeahead_index(version)
+                self.version = version
+
+@st.cache_resource
+def get_typeahead() -> TypeaheadHolder:
+    return TypeaheadHolder()
+
+@st.cache_resource
+def start_typeahead_server():
+    """Serve /api/typeahead?q=&field=&k= from a daemon thread; one per process."""
+    typeahead = get_typeahead()
+
+    class Handler(SidecarHandler):
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            if path != "/api/typeahead":
+                self.send_error(404)
+                return
+            index = typeahead.index
+            if index is None:  # no catalog page has been rendered yet
+                self.send_error(503)
+                return
+            qs = parse_qs(query)
+            field = (qs.get("field") or [SEARCH_PARAM])[0]
+            try:
+                k = min(max(int((qs.get("k") or [TYPEAHEAD_K])[0]), 0), TYPEAHEAD_MAX_K)
+            except ValueError:
+                k = TYPEAHEAD_K
+            q = (qs.get("q") or [""])[0]
+            body = json.dumps({"field": field, "q": q, "items": index.suggest(field, q, k)}).encode("utf-8")
+            self.reply(body, "application/json", cache="public, max-age=60")
+
+    server = serve_sidecar("typeahead", TYPEAHEAD_BIND, int(TYPEAHEAD_PORT), Handler)
+    if server is not None:
+        print(f"[typeahead] serving http://{TYPEAHEAD_BIND}:{TYPEAHEAD_PORT}/api/typeahead")
+    return server
+
+# ---------- SIMILAR TOOLS ----------
+# "Similar tools" on the detail page. Once per catalog version every tool gets
+# a facet vector (one column per label of every Tool_* table, incl. areas) and
+# a TF-IDF vector over description + bullets; both are IDF-weighted and
+# L2-normalised, so a block of rows times the transpose gives cosine scores.
+# Only the top SIMILAR_MAX_K neighbours per tool are kept: the detail page
+# does a dict lookup and never scores anything on request.
+SIMILAR_K = int(os.getenv("SIMILAR_K", "4"))
+SIMILAR_TEXT_WEIGHT = float(os.getenv("SIMILAR_TEXT_WEIGHT", "0.4"))
+SIMILAR_MAX_K = 12
+SIMILAR_BLOCK_ROWS = 512      # bounds the scratch score matrix to 512 x n
+_TERM = re.compile(r"[a-z][a-z0-9]{2,}")
+_STOPWORDS = frozenset(
+    "the and for with that this from are can its into their which also such use used using "
+    "based data tool tools provides provide allows users user more than other these them has "
+    "have been was were will not all any how what when where who".split()
+)
+
+def _idf_normalized(counts: np.ndarray) -> np.ndarray:
+    """IDF-weight the columns of a (docs x terms) count matrix and L2-normalise its rows."""
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + counts.shape[0]) / (1 + df)) + 1.0
+    m = counts * idf.astype(np.float32)
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return np.divide(m, norms, out=np.zeros_like(m), where=norms > 0)
+
+def _facet_matrix(pos: pd.Index, frames: list[pd.DataFrame]) -> np.ndarray:
+    """One 0/1 column per (table, label); rows follow `pos` (tool ids)."""
+    blocks = []
+    for df in frames:
+        labels = df["label"].astype("category")
+        rows = pos.get_indexer(df["tool_id"])
+        ok = rows >= 0
+        block = np.zeros((len(pos), len(labels.cat.categories)), dtype=np.float32)
+        block[rows[ok], labels.cat.codes.to_numpy()[ok]] = 1.0
+        blocks.append(block)
+    return np.hstack(blocks) if blocks else np.zeros((len(pos), 0), dtype=np.float32)
+
+def _text_matrix(docs: list[str]) -> np.ndarray:
+    """Term counts over terms found in at least two docs (others cannot link two tools)."""
+    tokenized = [[t for t in _TERM.findall(d.lower()) if t not in _STOPWORDS] for d in docs]
+    doc_freq: dict[str, int] = {}
+    for terms in tokenized:
+        for t in set(terms):
+            doc_freq[t] = doc_freq.get(t, 0) + 1
+    vocab = {t: j for j, t in enumerate(sorted(t for t, n in doc_freq.items() if n >= 2))}
+    rows = [i for i, terms in enumerate(tokenized) for t in terms if t in vocab]
+    cols = [vocab[t] for terms in tokenized for t in terms if t in vocab]
+    counts = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+    np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+    return counts
+
+class SimilarityIndex:
+    """tool_id -> ((tool_id, score), …) best first; read-only, shared by all sessions."""
+
+    def __init__(self, top: dict[int, tuple[tuple[int, float], ...]]):
+        self.top = top
+
+    @classmethod
+    def build(cls, tools: pd.DataFrame, facet_frames: list[pd.DataFrame],
+              text_weight: float = SIMILAR_TEXT_WEIGHT, k: int = SIMILAR_MAX_K) -> "SimilarityIndex":
+        ids = tools["tool_id"].astype(int).to_numpy()
+        pos = pd.Index(ids)
+        text_cols = [c for c in ("tool_description", "bullet1", "bullet2", "bullet3") if c in tools.columns]
+        docs = tools[text_cols].fillna("").astype(str).agg(" ".join, axis=1).tolist() if text_cols else [""] * len(ids)
+        facets = _idf_normalized(_facet_matrix(pos, facet_frames))
+        text = _idf_normalized(_text_matrix(docs))
+
+        n, k = len(ids), min(k, max(len(ids) - 1, 0))
+        top: dict[int, tuple[tuple[int, float], ...]] = {}
+        for start in range(0, n if k else 0, SIMILAR_BLOCK_ROWS):
+            stop = min(start + SIMILAR_BLOCK_ROWS, n)
+            scores = (1.0 - text_weight) * (facets[start:stop] @ facets.T)
+            scores += text_weight * (text[start:stop] @ text.T)
+            scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # not similar to itself
+            best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best, best_scores = np.take_along_axis(best, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+            for r in range(stop - start):
+                top[int(ids[start + r])] = tuple(
+                    (int(ids[j]), round(float(s), 4)) for j, s in zip(best[r], best_scores[r]) if s > 0
+                )
+        return cls(top)
+
+    def similar(self, tool_id: int, k: int = SIMILAR_K) -> tuple[tuple[int, float], ...]:
+        return self.top.get(int(tool_id), ())[:k]
+
+    def stats(self) -> dict:
+        return {"tools": len(self.top), "with_neighbours": sum(1 for v in self.top.values() if v)}
+
+@st.cache_resource(max_entries=2)
+def get_similarity_index(version: str) -> SimilarityIndex:
+    """Similar-tools index for catalog `version`."""
+    frames = []
+    for label, table in MAP_TABLES.items():
+        try:
+            frames.append(load_filter_table(table))
+        except Exception as e:
+            print(f"[similar] skipped {label}: {e}")
+    try:
+        frames.append(load_area_table().rename(columns={"name": "label"})[["tool_id", "label"]])
+    except Exception as e:
+        print(f"[similar] skipped Tool_Area: {e}")
+    return SimilarityIndex.build(load_tools(), frames)
+
+# ---------- TOOL RECORDS ----------
+# Per-tool records for the compare view: every facet value of every tool,
+# built once per catalog version with one groupby per Tool_* table, so a
+# comparison is a few dict lookups instead of masking each table per tool.
+COMPARE_MAX_TOOLS = int(os.getenv("COMPARE_MAX_TOOLS", "4"))
+AREA_SCOPE_LABEL, AREA_NAMES_LABEL = "Area Scope", "Area (Names)"
+
+@st.cache_resource(max_entries=2)
+def get_tool_records(version: str) -> dict[int, dict]:
+    """tool_id -> {"name", "link", "facets": {filter label -> sorted values}} for catalog `version`."""
+    tools = load_tools()
+    records = {
+        int(tid): {"name": str(name), "link": "" if pd.isna(link) else str(link).strip(), "facets": {}}
+        for tid, name, link in zip(tools["tool_id"], tools["tool_name"], tools.get("link", pd.Series("", index=tools.index)))
+    }
+
+    def put(label: str, values_by_tool: dict):
+        for tid, values in values_by_tool.items():
+            rec = records.get(int(tid))
+            if rec is not None and values:
+                rec["facets"][label] = _lower_sorted(values)
+
+    raw = read_table("Tools", ["tool_id", *TOOLS_VALUE_COLS.values()])
+    for label, col in TOOLS_VALUE_COLS.items():
+        vals = raw[col].astype("string").str.strip()
+        put(label, {tid: (v,) for tid, v in zip(raw["tool_id"], vals) if not pd.isna(v) and v})
+    for label, table in MAP_TABLES.items():
+        try:
+            df = load_filter_table(table)
+        except Exception as e:
+            print(f"[compare] skipped {label}: {e}")
+            continue
+        put(label, df.groupby("tool_id", observed=True)["label"].agg(lambda x: tuple(map(str, x.unique()))).to_dict())
+    scopes: dict[int, set[str]] = {}
+    names: dict[int, set[str]] = {}
+    for (scope, name), ids in get_geo_index(version).by_pair.items():
+        for tid in ids:
+            scopes.setdefault(tid, set()).add(scope)
+            names.setdefault(tid, set()).add(name)
+    put(AREA_SCOPE_LABEL, scopes)
+    put(AREA_NAMES_LABEL, names)
+    return records
+
+def compare_rows() -> list[tuple[str, list[str]]]:
+    """(section, filter labels) in sidebar order."""
+    return [
+        (section, [label for label, ref in items if label != "_SEARCH_"])
+        for section, items in SECTIONS.items()
+    ]
+
 # # Single-value filter coming directly from Tools (not a link table)
 # TOOLS_COLUMN_FILTERS = {
 #     "Area Scope": ("area_scope", ["Global", "Continent", "Region", "Country", "Subnational"])
@@ -1496,7 +2756,7 @@ def header_nav(active: str = "Tools",
 
     brand_left = (
         f'<a class="brand-left" href="?page=tools" target="_self" title="Adapt Tools">'
-        f'  <img src="{AT_LOGO_WIDE_URL}" alt="adapt tools logo" />'
+        f'  <img {img_srcset_attrs(AT_LOGO_WIDE_REL, "180px")} alt="adapt tools logo" />'
         f'</a>'
     ) if active != "Tools" else '<span class="brand-left" aria-hidden="true"></span>'
 
@@ -1534,7 +2794,7 @@ def header_nav(active: str = "Tools",
         f'    {brand_left}'
         f'    <span class="brand-center">'
         f'      <a href="?page=tools" target="_self" title="Adapt Tools">'
-        f'        <img src="{AT_LOGO_URL}" alt="adapt tools"/>'
+        f'        <img {img_srcset_attrs(AT_LOGO_REL, "160px")} alt="adapt tools"/>'
         f'      </a>'
         f'    </span>'
         f'    {desktop_nav}'
@@ -1544,7 +2804,7 @@ def header_nav(active: str = "Tools",
         '<div class="nav-spacer"></div>'
     )
 
-    brand_html = f'<img src="{LOGO_URL}" alt="FutureMed" />'
+    brand_html = f'<img {img_srcset_attrs(LOGO_REL, "165px")} alt="FutureMed" />'
     hero_html = f"""
     <div class="hero">
       <div class="brand">{brand_html}</div>
@@ -1570,12 +2830,45 @@ def options_for(table_name: str) -> list[str]:
     except Exception:
         return []
 
+# ---------- SUGGEST FORM SCHEMA ----------
+# All option lists of the suggest form as one object, keyed by payload field.
+# The importer publishes the same structure as form_schema.json in the
+# catalog snapshot; otherwise it is built from the loaders. Cached as a
+# resource per catalog version, so a render is one lookup and no unpickling.
+# Option sources and with_other() come from catalog_schema, shared with the importer.
+def build_form_schema() -> dict:
+    options = {key: with_other(options_for(table)) for key, table in FORM_OPTION_TABLES.items()}
+    options.update({col: with_other(options_from_tools_column(col)) for col in FORM_OPTION_COLUMNS})
+    try:
+        area_names = list(get_geo_index(catalog_version()).all_names)
+    except Exception:
+        area_names = []
+    return {"options": options, "area_scopes": AREA_SCOPES, "area_names": area_names}
+
+@st.cache_resource(max_entries=2)
+def get_form_schema(version: str) -> dict:
+    """Form schema for catalog `version`; lists are tuples since the object is shared."""
+    schema = None
+    d = snapshot_dir() if CATALOG_BACKEND == "snapshot" else None
+    if d is not None and (d / "form_schema.json").exists():
+        try:
+            schema = json.loads((d / "form_schema.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"[catalog] unreadable form_schema.json in {d}: {e}; rebuilding")
+    if schema is None:
+        schema = build_form_schema()
+    return {
+        "options": {k: tuple(v) for k, v in schema["options"].items()},
+        "area_scopes": tuple(schema["area_scopes"]),
+        "area_names": tuple(schema["area_names"]),
+    }
+
 # Small DDL helper to ensure the Tool_Submissions table exists
 def ensure_submissions_table():
     """
-    (Disabled) Left here for a future moderated-ingest pipeline that writes to MySQL.
-    For now, submissions are **not** written to the database; they are stored on disk
-    as CSV/JSON under SUBMIT_DIR and reviewed by moderators before any DB import.
+    (Disabled) The app never writes submissions to the database; they are stored on
+    disk as a CSV/JSONL journal under SUBMIT_DIR. Moderators stage, review and apply
+    them with `app/scripts/ingest_submissions.py`, which owns `Tool_Submissions`.
     """
     return
 
@@ -1698,6 +2991,82 @@ def render_footer():
     """
     st.markdown(html, unsafe_allow_html=True)
 
+# ---------- RATE LIMITING ----------
+# Per-client token bucket for suggestion submits, checked before any Turnstile
+# call. Clients are keyed by IP as seen by Nginx (X-Real-IP, else the last
+# X-Forwarded-For hop, which Nginx appends; earlier hops are client-supplied),
+# falling back to the Streamlit session. Buckets idle long enough to have
+# refilled carry no state and are evicted; the table is capped in size.
+SUGGEST_RATE_PER_MIN = float(os.getenv("SUGGEST_RATE_PER_MIN", "2"))
+SUGGEST_BURST = float(os.getenv("SUGGEST_BURST", "5"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+
+class TokenBucketLimiter:
+    """Token buckets per key in an LRU-ordered dict of (tokens, last_seen)."""
+
+    def __init__(self, rate_per_s: float, burst: float, max_keys: int):
+        self.rate = rate_per_s
+        self.burst = burst
+        self.max_keys = max(1, max_keys)
+        # A bucket idle this long is full again, i.e. equivalent to no entry
+        self.ttl_s = burst / rate_per_s if rate_per_s > 0 else float("inf")
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def take(self, key: str, cost: float = 1.0) -> tuple[bool, float]:
+        """Spend `cost` tokens. Returns (allowed, seconds until enough tokens)."""
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            else:
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)  # re-insert at the MRU end
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        wait = 0.0 if allowed else ((cost - tokens) / self.rate if self.rate > 0 else float("inf"))
+        return allowed, wait
+
+    def _evict(self, now: float):
+        # Oldest-seen first, so expired entries are always at the front
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last < self.ttl_s:
+                break
+            del self._buckets[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"keys": len(self._buckets), "max_keys": self.max_keys, "rejected": self.rejected}
+
+@st.cache_resource
+def get_suggest_limiter() -> TokenBucketLimiter:
+    return TokenBucketLimiter(SUGGEST_RATE_PER_MIN / 60.0, SUGGEST_BURST, RATE_LIMIT_MAX_KEYS)
+
+def client_ip() -> str | None:
+    try:
+        headers = _get_websocket_headers() or {}
+    except Exception:
+        return None
+    real_ip = (headers.get("X-Real-Ip") or headers.get("X-Real-IP") or "").strip()
+    if real_ip:
+        return real_ip
+    hops = [h.strip() for h in (headers.get("X-Forwarded-For") or "").split(",") if h.strip()]
+    return hops[-1] if hops else None
+
+def client_key() -> str:
+    ip = client_ip()
+    if ip:
+        return f"ip:{ip}"
+    ctx = get_script_run_ctx()
+    return f"session:{ctx.session_id if ctx else 'unknown'}"
+
+
 def render_turnstile_widget() -> str:
     """Render real Turnstile component and mirror token into session_state."""
     site_key = TURNSTILE_SITE_KEY
@@ -1738,58 +3107,29 @@ def suggest_page():
     )
     st.caption("Submitted tools are **reviewed by moderators** before appearing in the tool catalog.")
 
-    # Preload options from mapping tables
-    user_groups = options_for("Tool_UserGroup")
-    sectors = options_for("Tool_SectorFocus")
-    tool_types = options_for("Tool_ToolType")
-    scale_pol = options_for("Tool_TargetScale_Political")
-    scale_phy = options_for("Tool_TargetScale_Physical")
-    temporal_scales = options_for("Tool_TemporalScale")
-    temporal_res = options_for("Tool_TemporalResolution")
-    methods = options_for("Tool_MethodologicalApproach")
-    data_util = options_for("Tool_DataUtilization")
-    outputs = options_for("Tool_OutputType")
-    access = options_for("Tool_AccessibilityAndUsability")
-    languages = options_for("Tool_Language")
-    maintenance_opts = options_for("Tool_Maintenance")
-    support_opts = options_for("Tool_Support")
-
-    # single-value columns from Tools (use existing distincts)
-    customizability_opts = options_from_tools_column("customizability")
-    integration_opts = options_from_tools_column("integration_capability")
-    validation_opts = options_from_tools_column("validation_and_reliability")
-    cost_opts = options_from_tools_column("cost")
-
-    area_scopes = ["Global", "Continent", "Region", "Country", "Subnational"]
-    try:
-        area_names = sorted(load_area_table()["name"].dropna().unique().tolist(), key=lambda x: x.lower())
-    except Exception:
-        area_names = []
-
-    def with_other(opts: list[str]) -> list[str]:
-        out = [o for o in (opts or []) if isinstance(o, str) and o.strip()]
-        if "Other" not in out:
-            out.append("Other")
-        return out
-
-    user_groups = with_other(user_groups)
-    sectors = with_other(sectors)
-    tool_types = with_other(tool_types)
-    scale_pol = with_other(scale_pol)
-    scale_phy = with_other(scale_phy)
-    temporal_scales = with_other(temporal_scales)
-    temporal_res = with_other(temporal_res)
-    methods = with_other(methods)
-    data_util = with_other(data_util)
-    outputs = with_other(outputs)
-    access = with_other(access)
-    languages = with_other(languages)
-    maintenance_opts = with_other(maintenance_opts)
-    support_opts = with_other(support_opts)
-    customizability_opts = with_other(customizability_opts)
-    integration_opts = with_other(integration_opts)
-    validation_opts = with_other(validation_opts)
-    cost_opts = with_other(cost_opts)
+    # Every option list comes from one precomputed form schema (sorted, "Other" appended)
+    schema = get_form_schema(catalog_version())
+    opts = schema["options"]
+    user_groups = opts["user_groups"]
+    sectors = opts["sectors"]
+    tool_types = opts["tool_types"]
+    scale_pol = opts["target_scale_political"]
+    scale_phy = opts["target_scale_physical"]
+    temporal_scales = opts["temporal_scale"]
+    temporal_res = opts["temporal_resolution"]
+    methods = opts["methodological_approach"]
+    data_util = opts["data_utilization"]
+    outputs = opts["output_type"]
+    access = opts["accessibility_and_usability"]
+    languages = opts["languages"]
+    maintenance_opts = opts["maintenance"]
+    support_opts = opts["support"]
+    customizability_opts = opts["customizability"]
+    integration_opts = opts["integration_capability"]
+    validation_opts = opts["validation_and_reliability"]
+    cost_opts = opts["cost"]
+    area_scopes = schema["area_scopes"]
+    area_names = schema["area_names"]
 
     with st.form("tool_suggestion_form", clear_on_submit=False):
         # Make selectbox placeholders render muted (fallback for older Streamlit)
@@ -1992,6 +3332,14 @@ def suggest_page():
         # token = st.session_state.get("turnstile_token", "")
 
         if submitted:
+            # Per-client throttle, before any token handling or remote verification
+            allowed, retry_s = get_suggest_limiter().take(client_key())
+            if not allowed:
+                if METRICS_ENABLED:
+                    get_metrics().inc("adapt_tools_rate_limited_total", {"form": "suggest"})
+                st.error(f"Too many submissions from your connection. Please try again in {max(1, round(retry_s))} s.")
+                st.stop()
+
             # Pull the mirrored token + timestamp
             tok = (st.session_state.get("cf_token") or "").strip()
             ts_ms = int(st.session_state.get("cf_token_ts_ms") or 0)
@@ -2016,21 +3364,15 @@ def suggest_page():
                 _reset_turnstile()
                 st.stop()
 
-            # Server-side verification (single call)
-            ok, resp = verify_turnstile(tok, None)
+            # Server-side verification (single call) runs on a worker thread while
+            # the fields are validated below; its outcome is reported first.
+            verify_t0 = time.perf_counter()
+            verify_pending = verify_turnstile_async(tok, client_ip())
 
             # Token can be used ONLY once; clear it regardless of outcome
             _reset_turnstile()
 
-            if not ok:
-                codes = set((resp or {}).get("error-codes") or [])
-                if "timeout-or-duplicate" in codes:
-                    st.error("Turnstile verification failed (expired or already used). Please verify again and submit.")
-                else:
-                    st.error("Turnstile verification failed. Please try again.")
-                st.caption(f"Debug (verify): {resp}")
-                st.stop()
-            # ---------------- Field validation (runs only if Turnstile OK) ----------------
+            # ---------------- Field validation (reported only if Turnstile OK) ----------------
             errs = []
             tool_name_local = sanitize_text(tool_name, max_len=140)
             link_local = link.strip()
@@ -2041,6 +3383,10 @@ def suggest_page():
             if not is_valid_url(link_local):
                 errs.append("Tool URL must start with http(s) and include a host (e.g., https://example.org).")
 
+            # Likely duplicates are flagged on the record for moderators, not rejected:
+            # a suggestion for a listed tool may be a correction or an update
+            dups = find_duplicates(tool_name_local, link_local)
+
             # Require taxonomy coverage (multiselects must not be empty)
             if not ug: errs.append("Please select at least one **User group**.")
             if not sec: errs.append("Please select at least one **Sector focus**.")
@@ -2072,6 +3418,24 @@ def suggest_page():
                 errs.append("Please select a **Primary area scope**.")
             # 'areas' can remain optional and be elaborated in notes
 
+            with st.spinner("Verifying…"):
+                ok, resp = wait_turnstile(verify_pending)
+            if METRICS_ENABLED:
+                m = get_metrics()
+                m.observe("adapt_tools_turnstile_verify_seconds", time.perf_counter() - verify_t0)
+                m.inc("adapt_tools_turnstile_verifications_total", {"result": "success" if ok else "failure"})
+
+            if not ok:
+                codes = set((resp or {}).get("error-codes") or [])
+                if (resp or {}).get("exception") == "verification queue busy":
+                    st.error("Verification is busy right now. Please verify again and submit in a moment.")
+                elif "timeout-or-duplicate" in codes:
+                    st.error("Turnstile verification failed (expired or already used). Please verify again and submit.")
+                else:
+                    st.error("Turnstile verification failed. Please try again.")
+                st.caption(f"Debug (verify): {resp}")
+                st.stop()
+
             if errs:
                 for e in errs:
                     st.error(e)
@@ -2103,11 +3467,20 @@ def suggest_page():
                 "primary_area_scope": scope,
                 "primary_area_of_focus": areas,
                 "notes": sanitize_text(desc, max_len=2000),
+                "possible_duplicates": dups,
             }
 
-            base = save_submission_files(tool_name_local, link_local, payload)
+            with observe_latency("adapt_tools_submission_write_seconds"):
+                ref = save_submission_files(tool_name_local, link_local, payload)
             st.success("Thank you! Your suggestion was saved for moderator review.")
-            st.caption(f"Reference: `{base.name}`. Moderators will validate and import approved entries.")
+            st.caption(f"Reference: `{ref}`. Moderators will validate and import approved entries.")
+            if dups:
+                st.info("It may duplicate: " + "; ".join(
+                    f"[{d['name']}](?page=tool&id={d['ref']}) (catalog, {d['reason']})" if d["kind"] == "catalog"
+                    else f"{d['name']} (pending review, {d['reason']})"
+                    for d in dups
+                ) + ". Moderators will check; if you meant to correct or update a listed tool, "
+                    "say so in the notes.")
             # Clear token after a successful submit to avoid re-use on rerun
             st.session_state.pop("cf_token", None)
 
@@ -2121,12 +3494,12 @@ def sidebar_filters(tools_df: pd.DataFrame):
     Render grouped sidebar sections.
     Returns:
       selections: dict of chosen options by logical key
-      tables: mapping table dataframes (for apply_filters)
+      tables: mapping table names by label (loaded by apply_filters)
       search_q: text
       geo: dict with 'scopes' and 'areas' (sets)
     """
     selections: dict[str, set] = {}
-    tables: dict[str, pd.DataFrame] = {}
+    tables: dict[str, str] = {}
     search_q = ""
     geo_scopes: set[str] = set()
     geo_areas: set[str] = set()
@@ -2135,12 +3508,14 @@ def sidebar_filters(tools_df: pd.DataFrame):
     st.sidebar.markdown(
         f"""
         <div class="sidebar-logo" style="padding-top:10px; text-align:center; margin-bottom:28px; padding-left:0px;">
-            <img src="{AT_LOGO_URL}" alt="Adapt Tools Logo" style="max-width:250px;">
+            <img {img_srcset_attrs(AT_LOGO_REL, "250px")} alt="Adapt Tools Logo" style="max-width:250px;">
         </div>
         """,
         unsafe_allow_html=True,
     )
 
+    sidebar_options = get_sidebar_options(catalog_version())
+
     st.sidebar.header("Tool Basics")
     st.sidebar.markdown('New here? See the **[Filter Guide](?page=guide)** for explanations.', unsafe_allow_html=True)
 
@@ -2152,15 +3527,18 @@ def sidebar_filters(tools_df: pd.DataFrame):
         for label, ref in items:
             # 1) Search box
             if label == "_SEARCH_":
+                if SEARCH_MODE == "debounced":
+                    continue  # rendered above the results by results_fragment
+                seed_widget_from_url("flt_search")
                 search_q = st.sidebar.text_input("Search tool", "", key="flt_search", help="Find tools by name. Use the filters below to refine results.")
                 continue
 
             # Area Scope
             if ref == "_AREA_SCOPE_":
                 try:
-                    area_df = load_area_table()
-                    scopes = sorted(area_df["scope"].dropna().unique().tolist(), key=lambda x: x.lower())
-                    chosen = st.sidebar.multiselect("Area Scope", options=scopes, default=[], key="flt_area_scope", help=HELP_TEXTS.get("Area Scope"))
+                    geo_index = get_geo_index(catalog_version())
+                    seed_widget_from_url("flt_area_scope", geo_index.scopes)
+                    chosen = st.sidebar.multiselect("Area Scope", options=geo_index.scopes, default=None, key="flt_area_scope", help=HELP_TEXTS.get("Area Scope"))
                     geo_scopes = set(chosen)
                 except Exception as e:
                     st.sidebar.warning(f"Area Scope: {e}")
@@ -2169,44 +3547,31 @@ def sidebar_filters(tools_df: pd.DataFrame):
             # Area (Names) – cascaded by selected scopes
             if ref == "_AREA_NAME_":
                 try:
-                    area_df = load_area_table()
-                    if geo_scopes:
-                        area_df = area_df[area_df["scope"].isin(geo_scopes)]
-                    names = sorted(area_df["name"].dropna().unique().tolist(), key=lambda x: x.lower())
-                    chosen = st.sidebar.multiselect("Area (Names)", options=names, default=[], key="flt_area_names", help=HELP_TEXTS.get("Area (Names)"))
+                    names = get_geo_index(catalog_version()).names_for(geo_scopes)
+                    seed_widget_from_url("flt_area_names", names)
+                    chosen = st.sidebar.multiselect("Area (Names)", options=names, default=None, key="flt_area_names", help=HELP_TEXTS.get("Area (Names)"))
                     geo_areas = set(chosen)
                 except Exception as e:
                     st.sidebar.warning(f"Area (Names): {e}")
                 continue
 
-            # 3) Tools-table single-value columns
-            if isinstance(ref, str) and ref in TOOLS_VALUE_COLS.values():
+            # 3) Tools-table single-value columns and 4) mapping-table filters (Tool_*).
+            # Mapping tables are passed to apply_filters by name and only loaded
+            # there, i.e. on a result-cache miss.
+            if ref not in TOOLS_VALUE_COLS.values():
+                tables[label] = ref
+            options = sidebar_options.get(label)
+            if options is None:
                 try:
-                    col = ref
-                    opts = options_from_tools_column(col)
-                    # For Multi-language Support, show simple choices if present (Yes/No)
-                    # Use explicit key for widget
-                    key = f"flt_{_slug(label)}"
-                    chosen = st.sidebar.multiselect(label, options=opts, default=[], key=key, help=HELP_TEXTS.get(label))
-                    selections[label] = set(chosen)
+                    options = sidebar_option_list(ref)
                 except Exception as e:
                     st.sidebar.warning(f"{label}: {e}")
                     selections[label] = set()
-                continue
-
-            # 4) Mapping-table filters (Tool_*)
-            try:
-                tbl = ref if isinstance(ref, str) else None
-                df = load_filter_table(tbl)
-                tables[label] = df
-                options = sorted(df["label"].dropna().unique().tolist())
-                key = f"flt_{_slug(label)}"
-                chosen = st.sidebar.multiselect(label, options=options, default=[], key=key, help=HELP_TEXTS.get(label))
-                selections[label] = set(chosen)
-            except Exception as e:
-                st.sidebar.warning(f"{label}: {e}")
-                selections[label] = set()
-                tables[label] = pd.DataFrame(columns=["tool_id", "label"])
+                    continue
+            key = f"flt_{_slug(label)}"
+            seed_widget_from_url(key, options)
+            chosen = st.sidebar.multiselect(label, options=options, default=None, key=key, help=HELP_TEXTS.get(label))
+            selections[label] = set(chosen)
 
 
     # ---- Clear-all must run after all widgets instantiate ----
@@ -2216,16 +3581,19 @@ def sidebar_filters(tools_df: pd.DataFrame):
         for k in list(st.session_state.keys()):
             if k.startswith("flt_"):
                 st.session_state.pop(k, None)
+        # ...and from the URL, or the next run would seed them back
+        clear_filters_from_url()
         # force a fresh run where widgets will be built with empty state
         st.rerun()
 
     geo = {"scopes": geo_scopes, "areas": geo_areas}
     return selections, tables, search_q, geo
 
+@traced("apply_filters")
 def apply_filters(tools_df: pd.DataFrame, selections: dict, tables: dict, search_q: str, geo: dict) -> pd.DataFrame:
     """
     Intersect tool_ids across:
-      - mapping-table selections (Tool_* tables via `tables`)
+      - mapping-table selections (Tool_* tables via `tables`: DataFrames or table names)
       - Tools-table single-value filters (TOOLS_VALUE_COLS)
       - Geography (Tool_Area with scope/name)
       - Free-text search (tool_name)
@@ -2237,10 +3605,12 @@ def apply_filters(tools_df: pd.DataFrame, selections: dict, tables: dict, search
         chosen = selections.get(label, set())
         if not chosen:
             continue
+        if isinstance(df_map, str):
+            df_map = load_filter_table(df_map)
         if df_map is None or df_map.empty:
             current_ids = set()
             break
-        keep = set(df_map[df_map["label"].isin(chosen)]["tool_id"].astype(int).tolist())
+        keep = set(df_map["tool_id"].to_numpy()[codes_isin(df_map["label"], chosen)].astype(int).tolist())
         current_ids &= keep
 
     # 2) Tools-table single-value filters
@@ -2260,13 +3630,7 @@ def apply_filters(tools_df: pd.DataFrame, selections: dict, tables: dict, search
     scopes = geo.get("scopes", set())
     areas  = geo.get("areas", set())
     if scopes or areas:
-        a = load_area_table()
-        if scopes:
-            a = a[a["scope"].isin(scopes)]
-        if areas:
-            a = a[a["name"].isin(areas)]
-        keep = set(a["tool_id"].dropna().astype(int).tolist())
-        current_ids &= keep
+        current_ids &= get_geo_index(catalog_version()).tool_ids(scopes, areas)
 
     # 4) Text search (tool name only to keep it precise)
     out = tools_df[tools_df["tool_id"].isin(current_ids)].copy()
@@ -2286,9 +3650,384 @@ def apply_filters(tools_df: pd.DataFrame, selections: dict, tables: dict, search
         )
         out = out[mask]
 
-    out = out.sort_values(by=["tool_name"], na_position="last")
+    return out  # catalog order; sort_results() applies the chosen ordering
+
+
+# ---------- FILTER RESULT CACHE ----------
+# Streamlit reruns the whole page on every interaction, most of which don't
+# change the filters. Results are memoized per canonical filter state in a
+# bounded LRU shared by all sessions of this process.
+FILTER_CACHE_SIZE = int(os.getenv("FILTER_CACHE_SIZE", "256"))
+
+class FilterResultCache:
+    """Thread-safe LRU of filter results (ordered tuples of tool_ids)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(0, maxsize)
+        self._data: OrderedDict[str, tuple[int, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> tuple[int, ...] | None:
+        with self._lock:
+            ids = self._data.get(key)
+            if ids is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return ids
+
+    def put(self, key: str, ids: tuple[int, ...]):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = ids
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+@st.cache_resource
+def get_filter_cache() -> FilterResultCache:
+    return FilterResultCache(FILTER_CACHE_SIZE)
+
+# ---------- FILTER STATE IN THE URL ----------
+# The filter state is mirrored into the query string in one canonical form
+# (one repeated param per facet, values sorted, empty facets dropped, search
+# lowercased), so views can be shared/bookmarked and a landing URL renders the
+# final result in a single rerun. The same canonical string keys the result
+# cache, so everyone landing on a popular view shares one cache entry.
+# Param names are the widget keys without the `flt_` prefix.
+SEARCH_PARAM = "search"
+AREA_SCOPE_PARAM = "area_scope"
+AREA_NAMES_PARAM = "area_names"
+
+def filter_url_params() -> set[str]:
+    """Every query param that carries filter state."""
+    out = {SEARCH_PARAM, AREA_SCOPE_PARAM, AREA_NAMES_PARAM}
+    for items in SECTIONS.values():
+        out.update(_slug(label) for label, ref in items if not (isinstance(ref, str) and ref.startswith("_")) and label != "_SEARCH_")
     return out
 
+def canonical_filter_params(selections: dict, geo: dict, search_q: str) -> list[tuple[str, str]]:
+    """Filter state as sorted (param, value) pairs; equal states give equal lists."""
+    pairs = [(_slug(label), str(v)) for label, chosen in selections.items() for v in chosen]
+    pairs += [(AREA_SCOPE_PARAM, v) for v in geo.get("scopes", ())]
+    pairs += [(AREA_NAMES_PARAM, v) for v in geo.get("areas", ())]
+    q = (search_q or "").strip().lower()
+    if q:
+        pairs.append((SEARCH_PARAM, q))
+    return sorted(pairs)
+
+def filter_cache_key(selections: dict, geo: dict, search_q: str, version: str) -> str:
+    """Hash of the canonical filter query string plus the catalog version."""
+    raw = urlencode(canonical_filter_params(selections, geo, search_q)) + f"&v={version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def seed_widget_from_url(key: str, options=None) -> None:
+    """
+    Preselect a sidebar widget from its URL param when it has no state yet
+    (landing on a shared link, or coming back to the catalog). Values that are
+    not among `options` are dropped; options=None means a text input.
+    """
+    if key in st.session_state:
+        return
+    values = st.query_params.get_all(key.removeprefix("flt_"))
+    if not values:
+        return
+    if options is None:
+        st.session_state[key] = values[-1]
+    else:
+        allowed = set(options)
+        st.session_state[key] = [v for v in dict.fromkeys(values) if v in allowed]
+
+def sync_filters_to_url(selections: dict, geo: dict, search_q: str) -> None:
+    """Write the canonical filter params to the URL (only when they changed)."""
+    facets = filter_url_params()
+    current = {k: st.query_params.get_all(k) for k in st.query_params}
+    wanted = {k: v for k, v in current.items() if k not in facets}
+    for k, v in canonical_filter_params(selections, geo, search_q):
+        wanted.setdefault(k, []).append(v)
+    if wanted != current:
+        st.query_params.from_dict(wanted)
+
+def clear_filters_from_url() -> None:
+    facets = filter_url_params()
+    st.query_params.from_dict({k: st.query_params.get_all(k) for k in st.query_params if k not in facets})
+
+def filter_tools_cached(tools_df: pd.DataFrame, selections: dict, tables: dict, search_q: str, geo: dict) -> pd.DataFrame:
+    """`apply_filters` behind the shared result cache."""
+    cache = get_filter_cache()
+    key = filter_cache_key(selections, geo, search_q, catalog_version())
+    ids = cache.get(key)
+    if ids is None:
+        out = apply_filters(tools_df, selections, tables, search_q, geo)
+        cache.put(key, tuple(out["tool_id"].astype(int).tolist()))
+        return out
+    pos = pd.Index(tools_df["tool_id"]).get_indexer(list(ids))
+    return tools_df.iloc[pos[pos >= 0]]
+
+
+# ---------- RESULT ORDERING ----------
+# Results are ordered by name, last update, number of matched filter values or
+# search relevance. The static orders are permutations of the catalog rows,
+# computed once per catalog version: ordering a result set walks a boolean
+# mask in that order, with no string comparisons per rerun. The query-dependent
+# orders score only the result rows and break ties on the precomputed name
+# rank. The order is not part of the filter state, so all orders share one
+# cached result set.
+SORT_PARAM = "sort"
+SORT_OPTIONS = {
+    "name": "Name (A–Z)",
+    "updated": "Recently updated",
+    "facets": "Most matching filters",
+    "relevance": "Search relevance",
+}
+DEFAULT_SORT = "name"
+
+class CatalogRanks:
+    """Orderings of the rows of one tools frame (row positions)."""
+
+    def __init__(self, tools: pd.DataFrame):
+        n = len(tools)
+        rows = tools.assign(_row=np.arange(n))
+        self.pos = pd.Index(tools["tool_id"].astype(int))
+        self.by_name = rows.sort_values(by=["tool_name"], na_position="last", kind="stable")["_row"].to_numpy()
+        self.name_rank = np.empty(n, dtype=np.int64)
+        self.name_rank[self.by_name] = np.arange(n)
+        if "updated_at" in tools.columns:
+            ts = pd.to_datetime(tools["updated_at"], errors="coerce")
+            missing = ts.isna().to_numpy()
+            ns = ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+            ns[missing] = 0
+            # newest first, undated last, then by name
+            self.by_updated = np.lexsort((self.name_rank, -ns, missing))
+        else:
+            self.by_updated = self.by_name
+        self.name_lower = tools["tool_name"].fillna("").astype(str).str.lower().to_numpy()
+        text_cols = [c for c in ("tool_description", "bullet1", "bullet2", "bullet3") if c in tools.columns]
+        self.text_lower = tools[text_cols].fillna("").astype(str).agg(" ".join, axis=1).str.lower().to_numpy()
+
+    def positions(self, tool_ids) -> np.ndarray:
+        p = self.pos.get_indexer(list(tool_ids))
+        return p[p >= 0]
+
+    def in_order(self, positions: np.ndarray, perm: np.ndarray) -> np.ndarray:
+        mask = np.zeros(len(perm), dtype=bool)
+        mask[positions] = True
+        return perm[mask[perm]]
+
+    def by_score(self, positions: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        return positions[np.lexsort((self.name_rank[positions], -scores))]
+
+    def relevance(self, positions: np.ndarray, q: str) -> np.ndarray:
+        """Name prefix > name hit > hits in description/bullets."""
+        names = pd.Series(self.name_lower[positions], dtype=object)
+        text = pd.Series(self.text_lower[positions], dtype=object)
+        q = re.escape(q)
+        return (
+            4 * names.str.match(q).to_numpy(dtype=np.int64)
+            + 3 * names.str.count(q).to_numpy(dtype=np.int64)
+            + text.str.count(q).to_numpy(dtype=np.int64)
+        )
+
+@st.cache_resource(max_entries=2)
+def get_catalog_ranks(version: str, _tools: pd.DataFrame) -> CatalogRanks:
+    """Result orderings for catalog `version`, built from `_tools` (not hashed)."""
+    return CatalogRanks(_tools)
+
+def catalog_ranks_for(tools: pd.DataFrame) -> CatalogRanks:
+    """
+    Ranks whose row positions match `tools`. catalog_version() and load_tools()
+    expire separately, so the cached ranks for a version may have been built
+    from an older frame; rebuild them from the frame being rendered.
+    """
+    ranks = get_catalog_ranks(catalog_version(), tools)
+    if not ranks.pos.equals(pd.Index(tools["tool_id"].astype(int))):
+        get_catalog_ranks.clear()
+        ranks = get_catalog_ranks(catalog_version(), tools)
+    return ranks
+
+def facet_match_counts(ranks: CatalogRanks, positions: np.ndarray, selections: dict, tables: dict, geo: dict) -> np.ndarray:
+    """
+    Selected values matched by each result row. Every result matches each active
+    filter at least once, so this counts the extra OR-hits inside multi-selects
+    (Tools-table filters are single-valued and add the same to every row).
+    """
+    counts = np.zeros(len(ranks.pos), dtype=np.int64)
+    for label, df_map in tables.items():
+        chosen = selections.get(label, set())
+        if not chosen:
+            continue
+        if isinstance(df_map, str):
+            df_map = load_filter_table(df_map)
+        np.add.at(counts, ranks.positions(df_map["tool_id"].to_numpy()[codes_isin(df_map["label"], chosen)]), 1)
+    if geo.get("scopes") or geo.get("areas"):
+        index = get_geo_index(catalog_version())
+        for s in geo.get("scopes", ()):
+            np.add.at(counts, ranks.positions(index.ids_by_scope.get(s, ())), 1)
+        for a in geo.get("areas", ()):
+            np.add.at(counts, ranks.positions(index.ids_by_name.get(a, ())), 1)
+    return counts[positions]
+
+def sort_results(tools: pd.DataFrame, filtered: pd.DataFrame, sort: str, selections: dict,
+                 tables: dict, search_q: str, geo: dict) -> pd.DataFrame:
+    """`filtered` (rows of `tools`) in the requested order."""
+    ranks = catalog_ranks_for(tools)
+    positions = ranks.positions(filtered["tool_id"].astype(int))
+    q = (search_q or "").strip().lower()
+    if sort == "relevance" and q:
+        order = ranks.by_score(positions, ranks.relevance(positions, q))
+    elif sort == "facets":
+        order = ranks.by_score(positions, facet_match_counts(ranks, positions, selections, tables, geo))
+    elif sort == "updated":
+        order = ranks.in_order(positions, ranks.by_updated)
+    else:  # "name", and "relevance" without a query
+        order = ranks.in_order(positions, ranks.by_name)
+    return tools.iloc[order]
+
+def render_sort_select() -> str:
+    """Sort selectbox, seeded from / mirrored to the `sort` URL param."""
+    if "sort_by" not in st.session_state:
+        seed = get_query_param(SORT_PARAM)
+        st.session_state["sort_by"] = seed if seed in SORT_OPTIONS else DEFAULT_SORT
+    sort = st.selectbox("Sort by", list(SORT_OPTIONS), format_func=SORT_OPTIONS.get, key="sort_by")
+    if sort == DEFAULT_SORT:
+        if SORT_PARAM in st.query_params:
+            del st.query_params[SORT_PARAM]
+    elif get_query_param(SORT_PARAM) != sort:
+        st.query_params[SORT_PARAM] = sort
+    return sort
+
+
+# ---------- SUBMISSION DEDUP ----------
+# Suggestions are checked against the catalog and the not-yet-ingested queue
+# on submit. Both sides are normalized into hash maps once (canonical URL
+# host+path, normalized name, name trigrams), so a check costs a few dict
+# lookups instead of a scan of the catalog or of SUBMIT_DIR.
+DUP_NAME_MIN_SIMILARITY = float(os.getenv("DUP_NAME_MIN_SIMILARITY", "0.7"))
+
+def canonical_url(u: str) -> str:
+    """`https://www.Example.org/tool/?x=1#top` -> `example.org/tool`."""
+    p = urlparse((u or "").strip().lower())
+    if not p.netloc and p.path:
+        p = urlparse("//" + p.path)  # bare host without scheme
+    host = p.netloc.rsplit("@", 1)[-1].split(":")[0].removeprefix("www.")
+    return f"{host}{p.path.rstrip('/')}" if host else ""
+
+def name_key(s: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", (s or "").lower()))
+
+def name_trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class DuplicateIndex:
+    """URL and name lookups over (kind, ref, name) entries; safe to extend while serving."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: list[tuple[str, str, str, int]] = []  # (kind, ref, name, trigram count)
+        self._by_url: dict[str, list[int]] = {}
+        self._by_name: dict[str, list[int]] = {}
+        self._by_gram: dict[str, list[int]] = {}
+
+    def add(self, kind: str, ref: str, name: str, link: str):
+        key, url = name_key(name), canonical_url(link)
+        grams = name_trigrams(key) if key else set()
+        with self._lock:
+            i = len(self._entries)
+            self._entries.append((kind, str(ref), name, len(grams)))
+            if url:
+                self._by_url.setdefault(url, []).append(i)
+            if key:
+                self._by_name.setdefault(key, []).append(i)
+            for g in grams:
+                self._by_gram.setdefault(g, []).append(i)
+
+    def match(self, name: str, link: str, limit: int = 3) -> list[dict]:
+        """Likely duplicates: same canonical URL, same normalized name, then trigram Jaccard."""
+        key, url = name_key(name), canonical_url(link)
+        found: dict[int, tuple[float, str]] = {}
+        with self._lock:
+            for i in self._by_url.get(url, ()) if url else ():
+                found[i] = (1.0, "same link")
+            for i in self._by_name.get(key, ()) if key else ():
+                found.setdefault(i, (1.0, "same name"))
+            grams = name_trigrams(key) if key else set()
+            shared: dict[int, int] = {}
+            for g in grams:
+                for i in self._by_gram.get(g, ()):
+                    shared[i] = shared.get(i, 0) + 1
+            for i, n in shared.items():
+                sim = n / (len(grams) + self._entries[i][3] - n)
+                if sim >= DUP_NAME_MIN_SIMILARITY and i not in found:
+                    found[i] = (sim, f"similar name ({sim:.0%})")
+            ranked = sorted(found.items(), key=lambda kv: kv[1][0], reverse=True)[:limit]
+            return [
+                {"kind": self._entries[i][0], "ref": self._entries[i][1], "name": self._entries[i][2],
+                 "score": round(score, 3), "reason": reason}
+                for i, (score, reason) in ranked
+            ]
+
+@st.cache_resource(max_entries=2)
+def get_catalog_dup_index(version: str) -> DuplicateIndex:
+    """Catalog side; rebuilt when the catalog version changes."""
+    idx = DuplicateIndex()
+    tools = load_tools()
+    for tid, name, link in zip(tools["tool_id"], tools["tool_name"].astype(str), tools["link"].fillna("").astype(str)):
+        idx.add("catalog", str(int(tid)), name, link)
+    return idx
+
+@st.cache_resource
+def get_pending_dup_index() -> DuplicateIndex:
+    """
+    Queue side, seeded once and then extended on each submit: journals not yet
+    staged, plus submissions in moderation (Tool_Submissions rows that were not
+    rejected; without access to that table, the journals in loaded/).
+    """
+    idx = DuplicateIndex()
+    seen: set[str] = set()
+
+    def add(ref: str, name: str, link: str):
+        if ref not in seen:
+            seen.add(ref)
+            idx.add("pending", ref, name, link)
+
+    def add_journals(paths):
+        for path in paths:
+            try:
+                with path.open(encoding="utf-8") as f:
+                    for line in f:
+                        rec = json.loads(line)
+                        add(rec.get("submission_ref", ""), rec.get("tool_name", ""), rec.get("link", ""))
+            except (OSError, ValueError) as e:
+                print(f"[dedup] skipping {path.name}: {e}")
+
+    sink = get_submission_sink()
+    add_journals([*sink.dir.glob("_current-*.jsonl"), *sink.dir.glob("submissions_*.jsonl")])
+    try:
+        staged = read_sql(
+            "SELECT submission_ref, tool_name, link FROM Tool_Submissions WHERE status <> 'rejected'"
+        )
+    except Exception as e:
+        print(f"[dedup] Tool_Submissions not readable ({e.__class__.__name__}); using {sink.dir / 'loaded'}")
+        add_journals(sorted((sink.dir / "loaded").glob("submissions_*.jsonl")))
+    else:
+        for ref, name, link in staged.fillna("").itertuples(index=False):
+            add(str(ref), str(name), str(link))
+    return idx
+
+def find_duplicates(tool_name: str, link: str) -> list[dict]:
+    matches = get_catalog_dup_index(catalog_version()).match(tool_name, link)
+    matches += get_pending_dup_index().match(tool_name, link)
+    return sorted(matches, key=lambda m: m["score"], reverse=True)[:3]
+
 
 def tool_card(tool: pd.Series, badges: dict[str, dict[int, list[str]]]):
     # img_path = tool_image_path(tool["tool_id"])
@@ -2332,23 +4071,90 @@ def tool_card(tool: pd.Series, badges: dict[str, dict[int, list[str]]]):
         unsafe_allow_html=True
     )
 
+def effective_query(q: str | None) -> str:
+    """The search actually applied: empty when shorter than SEARCH_MIN_CHARS."""
+    q = (q or "").strip()
+    return q if len(q) >= SEARCH_MIN_CHARS else ""
+
+def render_search_box() -> str:
+    """Debounced search box (public/assets/search_box.html); seeded from the URL."""
+    seed = (st.query_params.get_all(SEARCH_PARAM) or [""])[-1]
+    current = st.session_state.get("flt_search_box", seed)
+    value = SEARCH_BOX(
+        value=current,
+        placeholder="Search tools by name or description…",
+        min_chars=SEARCH_MIN_CHARS,
+        debounce_ms=SEARCH_DEBOUNCE_MS,
+        typeahead_url=TYPEAHEAD_URL,
+        typeahead_k=TYPEAHEAD_K,
+        default=seed,
+        key="flt_search_box",
+    )
+    return value if isinstance(value, str) else ""
+
+def _tool_images_mtime() -> float:
+    """mtime of public/assets/tools; adding or removing a card image bumps it."""
+    try:
+        return TOOLS_DIR.stat().st_mtime
+    except OSError:
+        return 0.0
+
+@st.cache_resource(max_entries=2)
+def get_card_html_cache(version: str, images_mtime: float) -> dict[int, str]:
+    """
+    tool_id -> card HTML for catalog `version`, filled on first render of each
+    card. Keyed on the tool image directory too: a card embeds either its image
+    or the placeholder, so images added by prepare_tool_assets.py show up.
+    """
+    return {}
+
+def card_grid_html(filtered: pd.DataFrame) -> str:
+    cards = get_card_html_cache(catalog_version(), _tool_images_mtime())
+    missing = [tid for tid in filtered["tool_id"].astype(int) if tid not in cards]
+    if missing:
+        badges = load_badge_maps()
+        for _, row in filtered[filtered["tool_id"].isin(missing)].iterrows():
+            cards[int(row["tool_id"])] = tool_card_html(row, badges).replace("\n", "")
+    return "".join(cards[tid] for tid in filtered["tool_id"].astype(int))
+
+def render_results(tools: pd.DataFrame, selections: dict, tables: dict, search_q: str, geo: dict):
+    search_q = effective_query(search_q)
+    sync_filters_to_url(selections, geo, search_q)
+
+    filtered = filter_tools_cached(tools, selections, tables, search_q, geo)
+    count_col, sort_col = st.columns([3, 1])
+    with sort_col:
+        sort = render_sort_select()
+    filtered = sort_results(tools, filtered, sort, selections, tables, search_q, geo)
+    count_col.caption(f"{len(filtered)} result(s)")
+
+    with perf_span("card_grid"):
+        st.markdown(f'<div class="card-grid">{card_grid_html(filtered)}</div>', unsafe_allow_html=True)
+
+@st.experimental_fragment
+def results_fragment(tools: pd.DataFrame, selections: dict, tables: dict, geo: dict):
+    """Search box + result grid; a new query reruns only this part of the page."""
+    render_results(tools, selections, tables, render_search_box(), geo)
+
 def list_tools_page():
     header_nav(active="Tools")
     render_fab_suggest(True)
     tools = load_tools()
+    if TYPEAHEAD_ENABLED:
+        try:
+            get_typeahead().refresh(catalog_version())
+        except Exception as e:
+            print(f"[typeahead] index not refreshed: {e}")
 
     selections, tables, search_q, geo = sidebar_filters(tools)
 
     st.title("Climate Change Adaptation Tools Catalog")
     st.write("Use the filters in the sidebar to explore the catalog.")
 
-    filtered = apply_filters(tools, selections, tables, search_q, geo)
-    st.caption(f"{len(filtered)} result(s)")
-
-    badges = load_badge_maps()
-    cards_html = "".join(tool_card_html(row, badges) for _, row in filtered.iterrows())
-    cards_html = cards_html.replace("\n", "")
-    st.markdown(f'<div class="card-grid">{cards_html}</div>', unsafe_allow_html=True)
+    if SEARCH_MODE == "debounced":
+        results_fragment(tools, selections, tables, geo)
+    else:
+        render_results(tools, selections, tables, search_q, geo)
 
     st.markdown("")  # tiny spacer if you want
     render_footer()
@@ -2415,7 +4221,7 @@ def team_page():
     def render_section(title: str, people: list[dict]) -> str:
         cards = []
         for p in people:
-            img_url = f"{TEAM_URL_BASE}/{p['img']}"
+            img_attrs = img_srcset_attrs(f"team/{p['img']}", "180px")
             role = p.get("role", "")
             org = p.get("org", "")
 
@@ -2432,7 +4238,7 @@ def team_page():
             # Order: name first, then role, then org, then links
             card = (
                 "<div class='person-card'>"
-                f"  <img class='avatar' src='{img_url}' alt='{escape(p['name'])}' loading='lazy' decoding='async' />"
+                f"  <img class='avatar' {img_attrs} alt='{escape(p['name'])}' loading='lazy' decoding='async' />"
                 f"  <div class='p-name'>{escape(p['name'])}</div>"
                 f"  <div class='p-role'>{escape(role)}</div>"
                 f"  <div class='p-org'>{escape(org)}</div>"
@@ -2623,6 +4429,7 @@ def guide_page():
 
 
 
+@traced("tool_detail_page")
 def tool_detail_page(tool_id: int):
     tools = load_tools()
     try:
@@ -2733,30 +4540,199 @@ def tool_detail_page(tool_id: int):
             unsafe_allow_html=True
         )
 
+    # --- Similar tools (precomputed per catalog version; a lookup here)
+    if SIMILAR_K > 0:
+        neighbours = get_similarity_index(catalog_version()).similar(tid)
+        if neighbours:
+            pos = pd.Index(tools["tool_id"]).get_indexer([n for n, _ in neighbours])
+            st.markdown("### Similar tools")
+            compare_ids = ",".join(str(i) for i in [tid, *(n for n, _ in neighbours)][:COMPARE_MAX_TOOLS])
+            st.markdown(f'<a href="?page=compare&ids={compare_ids}">Compare side by side →</a>', unsafe_allow_html=True)
+            st.markdown(f'<div class="card-grid">{card_grid_html(tools.iloc[pos[pos >= 0]])}</div>', unsafe_allow_html=True)
+
     st.markdown("---")
     st.markdown('<div class="back-link">↩︎ <a href="?page=tools">Back to all tools</a></div>', unsafe_allow_html=True)
 
     render_footer()
 
 
+def parse_compare_ids(raw: str | None) -> list[int]:
+    ids: list[int] = []
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if part.isdigit() and int(part) not in ids:
+            ids.append(int(part))
+    return ids[:COMPARE_MAX_TOOLS]
+
+def compare_table_html(recs: list[tuple[int, dict]], only_differences: bool) -> str:
+    head = "".join(
+        f"<th><a href='?page=tool&id={tid}'>{escape(rec['name'])}</a></th>" for tid, rec in recs
+    )
+    body: list[str] = []
+    for section, labels in compare_rows():
+        rows = []
+        for label in labels:
+            values = [rec["facets"].get(label, ()) for _, rec in recs]
+            differs = len(set(values)) > 1
+            if only_differences and not differs:
+                continue
+            cells = "".join(
+                f"<td>{escape(', '.join(v))}</td>" if v else "<td class='empty'>—</td>" for v in values
+            )
+            rows.append(f"<tr class='{'differs' if differs else ''}'><th class='row-label'>{escape(label)}</th>{cells}</tr>")
+        if rows:
+            body.append(f"<tr class='section'><th colspan='{len(recs) + 1}'>{escape(section)}</th></tr>")
+            body.extend(rows)
+    return (
+        "<div class='compare-wrap'><table class='compare'>"
+        f"<thead><tr><th class='row-label'></th>{head}</tr></thead>"
+        f"<tbody>{''.join(body)}</tbody></table></div>"
+    )
+
+def compare_page(raw_ids: str | None):
+    header_nav(active="Tools", show_hero=False)
+    render_fab_suggest(True)
+    st.markdown("<style>.block-container{padding-top:2rem !important;}</style>", unsafe_allow_html=True)
+    st.title("Compare tools")
+
+    records = get_tool_records(catalog_version())
+    recs = [(tid, records[tid]) for tid in parse_compare_ids(raw_ids) if tid in records]
+    if not recs:
+        st.error(f"No tools to compare. Use ?page=compare&ids=1,2,3 (up to {COMPARE_MAX_TOOLS} tools).")
+    else:
+        only_diff = len(recs) > 1 and st.toggle("Only show differences", key="compare_only_diff")
+        st.markdown(compare_table_html(recs, only_diff), unsafe_allow_html=True)
+
+    st.markdown("---")
+    st.markdown('<div class="back-link">↩︎ <a href="?page=tools">Back to all tools</a></div>', unsafe_allow_html=True)
+    render_footer()
+
+
+# ---------- INTERNAL PAGES ----------
+# Operational views (?page=_status, …) are disabled unless INTERNAL_PAGES_TOKEN
+# is set, and then require a matching `token` query parameter.
+INTERNAL_PAGES_TOKEN = os.getenv("INTERNAL_PAGES_TOKEN", "")
+
+def internal_page_allowed() -> bool:
+    given = get_query_param("token") or ""
+    return bool(INTERNAL_PAGES_TOKEN) and hmac.compare_digest(given, INTERNAL_PAGES_TOKEN)
+
+
+def status_page():
+    st.title("Status")
+    st.caption(f"adapt-tools v{APP_VERSION}" + (f" · {APP_REV}" if APP_REV else ""))
+
+    st.subheader("DB connection pool")
+    stats = get_pool_stats().snapshot(engine.pool)
+    cols = st.columns(4)
+    cols[0].metric("Checked out", stats["checkedout"] if stats["checkedout"] is not None else "n/a")
+    cols[1].metric("Overflow", stats["overflow"] if stats["overflow"] is not None else "n/a")
+    cols[2].metric("Avg wait (ms)", f"{stats['wait_avg_ms']:.2f}")
+    cols[3].metric("Max wait (ms)", f"{stats['wait_max_ms']:.2f}")
+    st.json(stats)
+
+    st.subheader("Submission journal")
+    sink = get_submission_sink()
+    st.json({"dir": str(sink.dir), "pending": sink.pending(), **sink.stats})
+
+    st.subheader("Suggest rate limit")
+    st.json({"rate_per_min": SUGGEST_RATE_PER_MIN, "burst": SUGGEST_BURST, **get_suggest_limiter().stats()})
+
+    st.subheader("Catalog")
+    st.json({
+        "backend": CATALOG_BACKEND,
+        "version": catalog_version(),
+        "filter_cache": get_filter_cache().stats(),
+        "snapshot_dir": str(CATALOG_SNAPSHOT_DIR),
+        "snapshot": load_snapshot_manifest(),
+    })
+
+    st.subheader("Pool configuration")
+    st.json({
+        "pool_class": type(engine.pool).__name__,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle_s": DB_POOL_RECYCLE_S,
+        "pool_timeout_s": DB_POOL_TIMEOUT_S,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    })
+
+
+PAGES = ("tools", "tool", "compare", "team", "contact", "suggest", "guide", "_status", "_perf")
+
+def perf_page():
+    st.title("Performance")
+    if not (PERF_TRACE or SQL_PROFILE):
+        st.info("Tracing is off. Start the app with PERF_TRACE=1 and/or SQL_PROFILE=1 to collect timings.")
+        return
+    if st.button("Reset counters"):
+        get_perf_registry().reset()
+        get_query_profiler().reset()
+
+    if PERF_TRACE:
+        st.subheader("Spans (this process)")
+        rows = get_perf_registry().snapshot()
+        if rows:
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No spans recorded yet.")
+
+        last = st.session_state.get("perf_last_rerun")
+        if last:
+            st.subheader("Previous rerun (this session)")
+            st.json(last)
+
+    if SQL_PROFILE:
+        profiler = get_query_profiler()
+        st.subheader("SQL statements (this process)")
+        st.caption(f"Slow-query threshold: {SLOW_QUERY_MS:g} ms")
+        rows = profiler.summary()
+        if rows:
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+            st.subheader("Most recent statements")
+            st.dataframe(pd.DataFrame(list(profiler.recent)[::-1][:50]), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No statements recorded yet.")
+
+
 def main():
     qp = st.query_params
     page = (qp.get("page")[0] if isinstance(qp.get("page"), list) else qp.get("page")) if qp.get("page") else "tools"
 
-    if page == "tool":
-        tool_id = qp.get("id")
-        tool_id = tool_id[0] if isinstance(tool_id, list) else tool_id
-        tool_detail_page(tool_id)
-    elif page == "team":
-        team_page()
-    elif page == "contact":
-        contact_page()
-    elif page == "suggest":
-        suggest_page()
-    elif page == "guide":
-        guide_page()
-    else:
-        list_tools_page()
+    if METRICS_ENABLED:
+        start_metrics_server()
+    if TYPEAHEAD_ENABLED:
+        start_typeahead_server()
+    _trace_local.spans = [] if PERF_TRACE else None
+    t0 = time.perf_counter()
+    try:
+        if page == "tool":
+            tool_id = qp.get("id")
+            tool_id = tool_id[0] if isinstance(tool_id, list) else tool_id
+            tool_detail_page(tool_id)
+        elif page == "compare":
+            compare_page(get_query_param("ids"))
+        elif page == "team":
+            team_page()
+        elif page == "contact":
+            contact_page()
+        elif page == "suggest":
+            suggest_page()
+        elif page == "guide":
+            guide_page()
+        elif page == "_status" and internal_page_allowed():
+            status_page()
+        elif page == "_perf" and internal_page_allowed():
+            perf_page()
+        else:
+            list_tools_page()
+    finally:
+        dt = time.perf_counter() - t0
+        page_label = page if page in PAGES else "tools"
+        if PERF_TRACE:
+            log_rerun(page_label, dt)
+        if METRICS_ENABLED:
+            record_rerun(page_label, dt)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+"""
+Catalog definitions shared by the app (app.py) and the importer
+(scripts/build_db_from_excel.py): the suggest-form option sources and the
+Tool_Area column detection. The importer publishes form_schema.json and
+geo_index.json from these; the app rebuilds the same objects from its
+loaders when the snapshot doesn't carry them, so both must agree.
+
+Pandas only; no Streamlit or database imports.
+"""
+from typing import Callable, List
+
+import pandas as pd
+
+# Suggest-form field -> link table with its options
+FORM_OPTION_TABLES = {
+    "user_groups": "Tool_UserGroup",
+    "sectors": "Tool_SectorFocus",
+    "tool_types": "Tool_ToolType",
+    "target_scale_political": "Tool_TargetScale_Political",
+    "target_scale_physical": "Tool_TargetScale_Physical",
+    "temporal_scale": "Tool_TemporalScale",
+    "temporal_resolution": "Tool_TemporalResolution",
+    "methodological_approach": "Tool_MethodologicalApproach",
+    "data_utilization": "Tool_DataUtilization",
+    "output_type": "Tool_OutputType",
+    "accessibility_and_usability": "Tool_AccessibilityAndUsability",
+    "languages": "Tool_Language",
+    "maintenance": "Tool_Maintenance",
+    "support": "Tool_Support",
+}
+# Single-value Tools columns whose distinct values are the options
+FORM_OPTION_COLUMNS = ["customizability", "integration_capability", "validation_and_reliability", "cost"]
+AREA_SCOPES = ["Global", "Continent", "Region", "Country", "Subnational"]
+
+
+def distinct_sorted(values) -> List[str]:
+    """Distinct non-empty strings, sorted case-insensitively."""
+    return sorted({v.strip() for v in values if isinstance(v, str) and v.strip()}, key=lambda x: x.lower())
+
+
+def with_other(values) -> List[str]:
+    """distinct_sorted(values) with "Other" appended if missing."""
+    out = distinct_sorted(values)
+    if "Other" not in out:
+        out.append("Other")
+    return out
+
+
+def _is_text(col: pd.Series) -> bool:
+    return col.dtype == object or isinstance(col.dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+
+def area_pairs(area: pd.DataFrame, tools_scope: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Tool_Area as distinct (tool_id Int64, scope, name) rows with empty values dropped.
+
+    Supports two Tool_Area schemas:
+      1) New:    tool_id, scope, name
+      2) Legacy: tool_id, label  (name only) -> scope from Tools.primary_area_scope,
+         fetched through `tools_scope()` (tool_id, primary_area_scope) only when needed
+    and, as a last resort, tool_id plus the first two text columns.
+    """
+    cols = {c.lower(): c for c in area.columns}
+
+    if {"tool_id", "scope", "name"}.issubset(cols):
+        out = area[[cols["tool_id"], cols["scope"], cols["name"]]].copy()
+        out.columns = ["tool_id", "scope", "name"]
+
+    elif "tool_id" in cols and "label" in cols:
+        t = tools_scope()[["tool_id", "primary_area_scope"]]
+        out = area[[cols["tool_id"], cols["label"]]].copy()
+        out.columns = ["tool_id", "name"]
+        out = out.merge(t, on="tool_id", how="left").rename(columns={"primary_area_scope": "scope"})
+
+    else:
+        str_cols = [c for c in area.columns if _is_text(area[c])]
+        if "tool_id" in area.columns and len(str_cols) >= 2:
+            out = area[["tool_id", str_cols[0], str_cols[1]]].copy()
+            out.columns = ["tool_id", "scope", "name"]
+        else:
+            raise ValueError(f"Tool_Area has unsupported columns: {list(area.columns)}")
+
+    out["tool_id"] = pd.to_numeric(out["tool_id"], errors="coerce").astype("Int64")
+    # "string" first: snapshot columns arrive as Categoricals, which can't take "" as a fill
+    out["scope"] = out["scope"].astype("string").fillna("").str.strip()
+    out["name"] = out["name"].astype("string").fillna("").str.strip()
+    out = out.dropna(subset=["tool_id"])
+    out = out[(out["scope"] != "") & (out["name"] != "")]
+    return out[["tool_id", "scope", "name"]].drop_duplicates()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+bench_catalog.py
+
+Benchmark the catalog pipeline on synthetic catalogs of increasing size.
+
+For each size it:
+  1. generates an `Inventory` workbook with realistic multi-value labels,
+  2. runs build_db_from_excel end to end against DB_URL (SQLite stand-in by
+     default, or a local MySQL) and publishes the Arrow snapshot,
+  3. loads app.py headless and times the loaders, apply_filters, the search
+     path and the card-grid HTML join on the result.
+
+Usage:
+  python bench_catalog.py [--sizes 1000 10000 100000] [--out bench.json]
+                          [--backend snapshot|db] [--db-url URL] [--repeat 5]
+
+Examples:
+  python app/scripts/bench_catalog.py --sizes 1000 10000 --out bench.json
+  python app/scripts/bench_catalog.py --db-url mysql+pymysql://u:p@127.0.0.1/bench --backend db
+
+The report is JSON: one record per (size, metric) with every repeat's wall
+time, so scaling curves can be compared across releases.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+import build_db_from_excel as importer
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+APP_PATH = SCRIPTS_DIR.parent / "app.py"
+REPO_DIR = SCRIPTS_DIR.parent.parent
+
+# ---------- Synthetic taxonomy ----------
+# Mirrors the real filter taxonomy; label popularity follows a Zipf-like curve
+# and cells carry 1-4 comma-separated labels, like the master Excel.
+MULTI_VOCAB = {
+    "user_group": ["Policymakers", "Municipal/Local Government", "Educators/Academia", "Private Sector",
+                   "Community Organizations/NGOs", "Researchers", "General Public"],
+    "sector": ["Agriculture", "All Sectors", "Biodiversity", "Coastal Management", "Cultural Heritage",
+               "Emergency Management", "Energy", "Food Security", "Forestry", "Health", "Industry",
+               "Infrastructure", "Socio-Economic", "Tourism", "Transport", "Urban Planning", "Waste",
+               "Water (Resources/Extremes)", "Wildfire"],
+    "tool_type": ["Decision Support System (DSS)", "Risk & Vulnerability Assessment", "Planning & Policy Guidance",
+                  "Data & Visualization", "Early Warning & Resilience", "Education & Awareness"],
+    "political_scale": ["Local", "Regional", "National", "International", "Multi-level (Political)"],
+    "physical_scale": ["Catchment/Watershed", "Ecosystem/Biome", "Urban/Rural Zone", "Landscape/Seascape",
+                       "Multi-level (Physical)"],
+    "temporal_scale": ["Past & Present", "Short Term (days)", "Medium Term (months)", "Long Term (decades)",
+                       "Multiple Scales"],
+    "temporal_resolution": ["Hourly", "Daily", "Monthly", "Seasonal", "Annual", "Multi-Year"],
+    "methodological_approach": ["Participatory / Stakeholder", "Scenario / Predictive / Quantitative",
+                                "Policy & Economic", "Spatial / GIS", "Frameworks / Structured Processes"],
+    "data_utilization": ["Quantitative Primary", "Quantitative Secondary", "Qualitative Primary",
+                         "Qualitative Secondary", "Mixed"],
+    "output_type": ["Reports & Guidelines", "Maps & Visualizations", "Simulations & Interactive Models",
+                    "Datasets", "Decision Facilitation", "Educational / Engagement"],
+    "accessibility_and_usability": ["High", "Moderate", "Low"],
+    "maintenance": ["Regular Updates", "Occasional Updates", "Static (No Updates)"],
+    "support": ["Full Technical Support", "Limited Support", "Community Support", "Static (No Support)"],
+    "language": ["English", "French", "Spanish", "Italian", "Greek", "Portuguese", "German", "Croatian",
+                 "Serbian", "Slovenian", "Turkish", "Arabic", "Hebrew", "Catalan", "Maltese", "Albanian",
+                 "Bosnian", "Montenegrin", "Macedonian", "Bulgarian", "Romanian", "Dutch", "Polish", "Czech"],
+}
+# Columns that are often left empty in the master Excel
+SPARSE_COLS = {"physical_scale": 0.35, "temporal_resolution": 0.25, "data_utilization": 0.15}
+
+SINGLE_VOCAB = {
+    "customizability": ["High", "Moderate", "Low", "Fixed", "Not Specified"],
+    "integration_capability": ["High", "Moderate", "No", "Not Specified"],
+    "validation_and_reliability": ["Peer-reviewed/endorsed", "Case-study validated", "Expert verified",
+                                   "User-tested/community feedback", "Not validated"],
+    "cost": ["Free", "Subscription-based", "One-time purchase", "Tiered pricing"],
+}
+
+AREAS = {
+    "Global": ["Global"],
+    "Continent": ["Europe", "Africa", "Asia", "North America", "South America", "Oceania"],
+    "Region": ["Mediterranean", "Alps", "Danube Basin", "Balkans", "Baltic Sea", "Middle East", "Sahel"],
+    "Country": ["Greece", "Italy", "Spain", "France", "Portugal", "Croatia", "Serbia", "Slovenia", "Cyprus",
+                "Malta", "Turkey", "Egypt", "Tunisia", "Morocco", "Israel", "Lebanon", "Albania", "Montenegro",
+                "Germany", "Austria", "United Kingdom", "United States", "Canada", "Australia"],
+    "Subnational": ["Crete", "Catalonia", "Sicily", "Provence", "Andalusia", "Dalmatia", "Tuscany", "Attica",
+                    "California", "Bavaria", "Sardinia", "Corsica"],
+}
+SCOPE_WEIGHTS = {"Global": 0.2, "Continent": 0.15, "Region": 0.2, "Country": 0.3, "Subnational": 0.15}
+
+WORDS = ("climate adaptation risk flood drought heat wave coastal erosion sea level rise water resources "
+         "urban planning vulnerability exposure hazard scenario projection indicator dashboard map model "
+         "stakeholder resilience early warning agriculture crop yield wildfire health energy demand tourism "
+         "ecosystem biodiversity policy guidance assessment monitoring data portal decision support local "
+         "regional national mediterranean basin catchment temperature precipitation storm surge").split()
+NAME_WORDS = ("Climate Adapt Risk Resilience Coastal Water Heat Flood Urban Drought Atlas Explorer Navigator "
+              "Toolkit Planner Monitor Portal Index Lens Compass Map Hub Wizard Insight").split()
+
+# Number of labels in a non-empty multi-value cell
+LABELS_PER_CELL = ([1, 2, 3, 4], [0.5, 0.3, 0.15, 0.05])
+
+
+def zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    return [1.0 / (i + 1) ** s for i in range(n)]
+
+
+def sentence(rng: random.Random, lo: int, hi: int) -> str:
+    words = rng.choices(WORDS, k=rng.randint(lo, hi))
+    return " ".join(words).capitalize() + "."
+
+
+def generate_workbook(n_tools: int, path: Path, seed: int = 42) -> Path:
+    """Write a synthetic `Inventory` sheet with `n_tools` rows in the importer's column layout."""
+    rng = random.Random(seed)
+    # Per-column popularity order is shuffled so not every facet favours its first label
+    weights = {}
+    for col, vocab in MULTI_VOCAB.items():
+        order = vocab[:]
+        rng.shuffle(order)
+        weights[col] = (order, zipf_weights(len(order)))
+
+    rows = []
+    for i in range(1, n_tools + 1):
+        row = {"tool_id": i}
+        row["tool_name"] = " ".join(rng.sample(NAME_WORDS, rng.randint(2, 3))) + f" {i}"
+        for col, (vocab, w) in weights.items():
+            if col == "language":
+                continue
+            if rng.random() < SPARSE_COLS.get(col, 0.0):
+                row[col] = ""
+                continue
+            k = rng.choices(*LABELS_PER_CELL)[0]
+            row[col] = ", ".join(dict.fromkeys(rng.choices(vocab, weights=w, k=k)))
+        langs = list(dict.fromkeys(rng.choices(weights["language"][0], weights=weights["language"][1],
+                                               k=rng.choices([1, 2, 3, 5], [0.6, 0.2, 0.15, 0.05])[0])))
+        row["language"] = ", ".join(langs)
+        row["is_multi_language"] = "Yes" if len(langs) > 1 else "No"
+        for col, vocab in SINGLE_VOCAB.items():
+            row[col] = rng.choices(vocab, weights=zipf_weights(len(vocab)))[0]
+        scope = rng.choices(list(SCOPE_WEIGHTS), weights=list(SCOPE_WEIGHTS.values()))[0]
+        row["primary_area_scope"] = scope
+        row["primary_area_of_focus"] = ", ".join(rng.sample(AREAS[scope], min(len(AREAS[scope]), rng.randint(1, 3))))
+        row["tool_description"] = " ".join(sentence(rng, 8, 20) for _ in range(rng.randint(3, 6)))
+        for b in ("bullet1", "bullet2", "bullet3"):
+            row[b] = sentence(rng, 6, 14)
+        row["link"] = f"https://tools.example.org/{i}/{rng.choice(NAME_WORDS).lower()}"
+        rows.append(row)
+
+    df = pd.DataFrame(rows, columns=importer.COLS)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_excel(path, sheet_name=importer.SHEET_NAME, index=False, engine="openpyxl")
+    return path
+
+
+# ---------- Timing ----------
+class Report:
+    def __init__(self):
+        self.records: list[dict] = []
+
+    def add(self, size: int, metric: str, seconds: list[float], **extra):
+        self.records.append({
+            "size": size,
+            "metric": metric,
+            "runs": len(seconds),
+            "seconds": [round(x, 6) for x in seconds],
+            "min_s": round(min(seconds), 6),
+            "median_s": round(statistics.median(seconds), 6),
+            **extra,
+        })
+        print(f"  {metric:<40} median {statistics.median(seconds) * 1000:10.2f} ms")
+
+    @contextmanager
+    def once(self, size: int, metric: str):
+        t0 = time.perf_counter()
+        yield
+        self.add(size, metric, [time.perf_counter() - t0])
+
+    def repeat(self, size: int, metric: str, fn, n: int, **extra):
+        times = []
+        result = None
+        for _ in range(n):
+            t0 = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - t0)
+        self.add(size, metric, times, **extra)
+        return result
+
+
+def git_sha() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return os.getenv("GIT_SHA", "")
+
+
+def load_app(env: dict):
+    """Import app.py headless (Streamlit bare mode) against the given catalog source."""
+    os.environ.update(env)
+    import streamlit as st
+    from streamlit import config
+    from streamlit.logger import set_log_level
+
+    config.get_config_options()  # parse first, or it resets the level below
+    set_log_level("error")  # bare mode warns on every cached function
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    spec = importlib.util.spec_from_file_location("adapt_tools_app", APP_PATH)
+    app = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = app  # declare_component() resolves its caller's module
+    spec.loader.exec_module(app)
+    return app
+
+
+def bench_build(report: Report, size: int, xlsx: Path, db_url: str, snapshot_dir: Path):
+    eng = importer.make_engine(db_url)
+    t0 = time.perf_counter()
+    with report.once(size, "build.load_excel"):
+        df = importer.load_excel(str(xlsx))
+    with report.once(size, "build.drop_and_create_schema"):
+        importer.drop_and_create_schema(eng)
+    with report.once(size, "build.insert_tools"):
+        importer.insert_tools(eng, df)
+    with report.once(size, "build.insert_links"):
+        importer.insert_links(eng, df)
+    with report.once(size, "build.create_view"):
+        importer.create_view(eng)
+    with report.once(size, "build.write_snapshot"):
+        importer.write_snapshot(eng, str(snapshot_dir))
+    report.add(size, "build.total", [time.perf_counter() - t0])
+    eng.dispose()
+
+
+def bench_app(report: Report, size: int, app, repeat: int):
+    with report.once(size, "load.load_tools_cold"):
+        tools = app.load_tools()
+    report.repeat(size, "load.load_tools_warm", app.load_tools, repeat)
+    with report.once(size, "load.filter_tables_cold"):
+        tables = {label: app.load_filter_table(tbl) for label, tbl in app.MAP_TABLES.items()}
+    with report.once(size, "load.load_area_table_cold"):
+        areas = app.load_area_table()
+    with report.once(size, "load.load_badge_maps_cold"):
+        badges = app.load_badge_maps()
+
+    def top(label: str) -> str:
+        return tables[label]["label"].value_counts().index[0]
+
+    area_top = areas["name"].value_counts().index[0]
+    scenarios = {
+        "none": ({}, {}),
+        "one_facet": ({"Sector Focus": {top("Sector Focus")}}, {}),
+        "three_facets": ({
+            "Sector Focus": {top("Sector Focus")},
+            "Tool Type": {top("Tool Type")},
+            "Target Scale (Political)": {top("Target Scale (Political)")},
+        }, {}),
+        "single_value_cols": ({"Cost": {"Free"}, "Customizability": {"High", "Moderate"}}, {}),
+        "geo": ({}, {"scopes": {"Country"}, "areas": {area_top}}),
+    }
+    for name, (selections, geo) in scenarios.items():
+        out = report.repeat(size, f"filter.{name}",
+                            lambda: app.apply_filters(tools, selections, tables, "", geo), repeat)
+        report.records[-1]["result_rows"] = len(out)
+
+    for q in ("water", "flood risk", "zzz-no-match"):
+        out = report.repeat(size, f"search.{q.replace(' ', '_')}",
+                            lambda: app.apply_filters(tools, {}, tables, q, {}), repeat)
+        report.records[-1]["result_rows"] = len(out)
+
+    # Same join list_tools_page performs for an unfiltered catalog
+    filtered = app.apply_filters(tools, {}, tables, "", {})
+    html = report.repeat(
+        size, "render.card_grid_all",
+        lambda: "".join(app.tool_card_html(row, badges) for _, row in filtered.iterrows()).replace("\n", ""),
+        max(1, repeat // 2),
+    )
+    report.records[-1]["html_bytes"] = len(html)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmark the catalog importer and app hot path on synthetic data.")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                   help="Catalog sizes (number of tools) to benchmark")
+    p.add_argument("--out", type=str, default="bench.json", help="Where to write the JSON report")
+    p.add_argument("--workdir", type=str, default="/tmp/adapt-tools-bench",
+                   help="Scratch directory for workbooks, SQLite files and snapshots")
+    p.add_argument("--db-url", type=str, default="",
+                   help="Target DB (default: a SQLite file per size in --workdir)")
+    p.add_argument("--backend", choices=["snapshot", "db"], default="snapshot",
+                   help="Catalog source the app reads from (CATALOG_BACKEND)")
+    p.add_argument("--repeat", type=int, default=5, help="Repeats for warm measurements")
+    p.add_argument("--seed", type=int, default=42, help="RNG seed for the synthetic catalog")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    workdir = Path(args.workdir).expanduser().resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    report = Report()
+    for size in args.sizes:
+        print(f"\n[INFO] Catalog size: {size}")
+        xlsx = workdir / f"inventory_{size}.xlsx"
+        with report.once(size, "generate.workbook"):
+            generate_workbook(size, xlsx, seed=args.seed)
+
+        db_url = args.db_url
+        if not db_url:
+            db_file = workdir / f"catalog_{size}.db"
+            db_file.unlink(missing_ok=True)
+            db_url = f"sqlite:///{db_file}"
+        snapshot_dir = workdir / f"snapshot_{size}"
+
+        bench_build(report, size, xlsx, db_url, snapshot_dir)
+        app = load_app({
+            "DB_URL": db_url,
+            "CATALOG_BACKEND": args.backend,
+            "CATALOG_SNAPSHOT_DIR": str(snapshot_dir),
+        })
+        bench_app(report, size, app, args.repeat)
+
+    doc = {
+        "schema": 1,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_sha": git_sha(),
+        "app_version": (REPO_DIR / "VERSION").read_text(encoding="utf-8").strip()
+        if (REPO_DIR / "VERSION").exists() else "",
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "db": args.db_url.split("://")[0] if args.db_url else "sqlite",
+        "seed": args.seed,
+        "results": report.records,
+    }
+    out = Path(args.out).expanduser().resolve()
+    out.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    print(f"\n[INFO] Report: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 # app/scripts/build_db_from_excel.py
 import os
-from typing import List, Dict, Tuple
+import sys
+import json
+import time
+import shutil
+import hashlib
+from datetime import datetime, timezone
+from typing import List, Dict, Tuple, Optional
 import pandas as pd
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import URL
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, make_url
 
 # -------- CONFIG (reads from env, with safe defaults for local dev) --------
 DB_USER = os.getenv("DB_USER", "futuremed")
@@ -11,6 +17,7 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "cost")   # << changed from DB_PASS
 DB_HOST = os.getenv("DB_HOST", "mysql")          # docker service name
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "futuremed")
+DB_URL = os.getenv("DB_URL", "")                 # optional full URL, overrides the parts above
 
 # New repo layout: we mount ../data -> /app/data (read-only)
 EXCEL_PATH = os.getenv("EXCEL_PATH", "/app/data/master/db_ready_master_cca_tools.xlsx")
@@ -49,6 +56,25 @@ LINK_MAP: Dict[str, List[str]] = {
     "Tool_Area": ["primary_area_of_focus"],  # free-text names; scope lives in Tools.primary_area_scope
 }
 
+# Columnar snapshot for app replicas running with CATALOG_BACKEND=snapshot.
+# Leave CATALOG_SNAPSHOT_DIR empty to skip writing it.
+SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", "/app/snapshot")
+SNAPSHOT_TABLES = ["Tools", *LINK_MAP.keys()]
+
+# Suggest-form option sources (form_schema.json) and the Tool_Area column
+# detection are shared with the app, which rebuilds the same objects when the
+# snapshot doesn't carry them.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from catalog_schema import (  # noqa: E402
+    AREA_SCOPES, FORM_OPTION_COLUMNS, FORM_OPTION_TABLES, area_pairs, distinct_sorted, with_other,
+)
+
+# Query profiling: SQL_PROFILE=1 times every statement (incl. pandas to_sql
+# batches) and prints a per-call-site summary at the end of the import.
+SQL_PROFILE = os.getenv("SQL_PROFILE", "0").strip().lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_STATS: Dict[Tuple[str, str], Dict[str, float]] = {}
+
 def norm(s: str) -> str:
     """Trim only. No auto-corrections so Excel remains the source of truth."""
     if s is None or (isinstance(s, float) and pd.isna(s)):
@@ -82,8 +108,12 @@ def load_excel(path: str) -> pd.DataFrame:
     df["tool_id"] = pd.to_numeric(df["tool_id"], errors="raise")
     return df
 
-def make_engine():
-    db_url = URL.create(
+def make_engine(url: Optional[str] = None):
+    """
+    Engine for the target DB. DB_URL (or `url`) overrides the DB_* parts, e.g.
+    sqlite:///catalog.db as a local stand-in for MySQL (benchmarks, dev).
+    """
+    db_url = url or DB_URL or URL.create(
         drivername="mysql+pymysql",
         username=DB_USER,
         password=DB_PASSWORD,
@@ -91,21 +121,76 @@ def make_engine():
         port=int(DB_PORT) if str(DB_PORT).isdigit() else None,
         database=DB_NAME,
     )
-    return create_engine(db_url, pool_pre_ping=True)
+    engine = create_engine(db_url, pool_pre_ping=True)
+    if SQL_PROFILE:
+        attach_query_profiler(engine)
+    return engine
+
+def _call_site() -> str:
+    """Importer function that issued the statement, e.g. `insert_links:205`."""
+    f = sys._getframe(1)
+    while f is not None:
+        if f.f_code.co_filename == __file__ and not f.f_code.co_name.startswith("_"):
+            return f"{f.f_code.co_name}:{f.f_lineno}"
+        f = f.f_back
+    return "?"
+
+def attach_query_profiler(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        dt = time.perf_counter() - conn.info["query_t0"].pop()
+        sql = " ".join(statement.split())[:120]
+        site = _call_site()
+        agg = QUERY_STATS.setdefault((site, sql), {"calls": 0, "rows": 0, "total_s": 0.0, "max_s": 0.0})
+        agg["calls"] += 1
+        agg["rows"] += max(cursor.rowcount, 0)
+        agg["total_s"] += dt
+        agg["max_s"] = max(agg["max_s"], dt)
+        if dt * 1000.0 >= SLOW_QUERY_MS:
+            print(f"🐢 slow query {dt * 1000.0:.1f} ms at {site} ({cursor.rowcount} rows): {sql}")
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(ctx):
+        starts = ctx.connection.info.get("query_t0") if ctx.connection is not None else None
+        if starts:
+            starts.pop()
+
+def print_query_summary(top: int = 15):
+    if not QUERY_STATS:
+        return
+    print(f"⏱️  SQL summary (top {top} by total time):")
+    rows = sorted(QUERY_STATS.items(), key=lambda kv: kv[1]["total_s"], reverse=True)[:top]
+    for (site, sql), a in rows:
+        print(f"   {a['total_s'] * 1000.0:9.1f} ms  {int(a['calls']):6d}×  {int(a['rows']):8d} rows  "
+              f"max {a['max_s'] * 1000.0:7.1f} ms  {site}  {sql}")
+
+def is_mysql(engine) -> bool:
+    return engine.dialect.name == "mysql"
 
 def drop_and_create_schema(engine):
+    # MySQL-only DDL bits are left out on other dialects (SQLite stand-in)
+    mysql = is_mysql(engine)
+    table_opts = " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4" if mysql else ""
+    on_update = " ON UPDATE CURRENT_TIMESTAMP" if mysql else ""
+    fulltext = (
+        ",\n          FULLTEXT KEY ft_tools_text (tool_name, tool_description, bullet1, bullet2, bullet3)"
+        if mysql else ""
+    )
+    tables = [*reversed(list(LINK_MAP.keys())), "Tools"]
+
     with engine.begin() as con:
         print("🧹 Dropping old tables (if any)…")
-        con.execute(text("SET FOREIGN_KEY_CHECKS=0;"))
-        con.execute(text("""
-            DROP TABLE IF EXISTS
-              Tool_Area, Tool_Language, Tool_Support, Tool_Maintenance,
-              Tool_AccessibilityAndUsability, Tool_OutputType, Tool_DataUtilization,
-              Tool_MethodologicalApproach, Tool_TemporalResolution, Tool_TemporalScale,
-              Tool_TargetScale_Physical, Tool_TargetScale_Political, Tool_ToolType,
-              Tool_SectorFocus, Tool_UserGroup, Tools;
-        """))
-        con.execute(text("SET FOREIGN_KEY_CHECKS=1;"))
+        if mysql:
+            con.execute(text("SET FOREIGN_KEY_CHECKS=0;"))
+            con.execute(text(f"DROP TABLE IF EXISTS {', '.join(tables)};"))
+            con.execute(text("SET FOREIGN_KEY_CHECKS=1;"))
+        else:
+            for t in tables:
+                con.execute(text(f"DROP TABLE IF EXISTS {t};"))
 
         print("🏗️  Creating schema…")
         con.execute(text(f"""
@@ -127,9 +212,8 @@ def drop_and_create_schema(engine):
           bullet3 VARCHAR(255),
           link TEXT,
           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-          FULLTEXT KEY ft_tools_text (tool_name, tool_description, bullet1, bullet2, bullet3)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP{on_update}{fulltext}
+        ){table_opts};
         """))
 
         def create_link(name: str):
@@ -138,10 +222,10 @@ def drop_and_create_schema(engine):
                 tool_id INT NOT NULL,
                 label VARCHAR(255) NOT NULL,
                 PRIMARY KEY (tool_id, label),
-                INDEX idx_{name}_label (label),
                 CONSTRAINT fk_{name}_tool FOREIGN KEY (tool_id) REFERENCES Tools(tool_id) ON DELETE CASCADE
-              ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+              ){table_opts};
             """))
+            con.execute(text(f"CREATE INDEX idx_{name}_label ON {name} (label);"))
 
         for t in LINK_MAP.keys():
             create_link(t)
@@ -180,6 +264,9 @@ def insert_links(engine, df: pd.DataFrame):
         write(table, pairs)
 
 def create_view(engine):
+    if not is_mysql(engine):
+        print("🔭 Skipping QA view view_tools_full (MySQL only).")
+        return
     with engine.begin() as con:
         print("🔭 Creating QA view view_tools_full …")
         con.execute(text("DROP VIEW IF EXISTS view_tools_full"))
@@ -221,9 +308,106 @@ def create_view(engine):
         GROUP BY t.tool_id;
         """))
 
+def build_form_schema(frames: Dict[str, pd.DataFrame]) -> dict:
+    """Option lists for the app's suggest form from the tables being published."""
+    tools = frames["Tools"]
+    options = {key: with_other(frames[table]["label"].tolist()) for key, table in FORM_OPTION_TABLES.items()}
+    options.update({
+        col: with_other(tools[col].dropna().astype(str).str.strip().tolist()) for col in FORM_OPTION_COLUMNS
+    })
+    area_names = distinct_sorted(tool_area_pairs(frames)["name"].tolist())
+    return {"options": options, "area_scopes": AREA_SCOPES, "area_names": area_names}
+
+def tool_area_pairs(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Tool_Area as (tool_id, scope, name), detected the same way as load_area_table() in app.py."""
+    return area_pairs(frames["Tool_Area"], lambda: frames["Tools"])
+
+def build_geo_index(frames: Dict[str, pd.DataFrame]) -> dict:
+    """
+    (scope, name) -> tool ids for the app's Area Scope / Area (Names) filters
+    (same data as GeoIndex in app.py).
+    """
+    pairs = tool_area_pairs(frames)
+    grouped = pairs.groupby(["scope", "name"])["tool_id"]
+    return {"pairs": [[s, n, sorted(int(i) for i in ids)] for (s, n), ids in grouped]}
+
+def write_snapshot(engine, out_dir: str = SNAPSHOT_DIR, keep: int = 2):
+    """
+    Publish Tools and every link table (incl. Tool_Area), as stored in MySQL,
+    as Arrow IPC files with dictionary-encoded `label` columns.
+
+    Layout:
+      {out_dir}/{stamp}_{version}/{table}.arrow + form_schema.json + geo_index.json + manifest.json
+      {out_dir}/CURRENT  -> name of the live version directory
+
+    A version directory is complete before CURRENT is flipped (atomic rename),
+    so replicas that memory-map the files never see a half-written catalog.
+    Older versions beyond `keep` are pruned; open maps of them stay valid.
+    """
+    import pyarrow as pa
+
+    print(f"🗂️  Writing catalog snapshot to {out_dir} …")
+    blobs: Dict[str, "pa.Buffer"] = {}
+    rows: Dict[str, int] = {}
+    frames: Dict[str, pd.DataFrame] = {}
+    digest = hashlib.sha256()
+    for table in SNAPSHOT_TABLES:
+        df = frames[table] = pd.read_sql(f"SELECT * FROM `{table}`", engine)
+        tbl = pa.Table.from_pandas(df, preserve_index=False)
+        if "label" in tbl.column_names:
+            i = tbl.column_names.index("label")
+            tbl = tbl.set_column(i, "label", tbl.column("label").dictionary_encode())
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, tbl.schema) as writer:
+            writer.write_table(tbl)
+        blobs[table] = sink.getvalue()
+        rows[table] = tbl.num_rows
+        digest.update(table.encode("utf-8"))
+        digest.update(blobs[table])
+
+    version = digest.hexdigest()[:12]
+    created = datetime.now(timezone.utc)
+    name = f"{created.strftime('%Y%m%dT%H%M%SZ')}_{version}"
+    final_dir = os.path.join(out_dir, name)
+    tmp_dir = final_dir + ".tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for table, buf in blobs.items():
+        with open(os.path.join(tmp_dir, f"{table}.arrow"), "wb") as f:
+            f.write(buf)
+    with open(os.path.join(tmp_dir, "form_schema.json"), "w", encoding="utf-8") as f:
+        json.dump(build_form_schema(frames), f, ensure_ascii=False)
+    with open(os.path.join(tmp_dir, "geo_index.json"), "w", encoding="utf-8") as f:
+        json.dump(build_geo_index(frames), f, ensure_ascii=False)
+    manifest = {
+        "version": version,
+        "created_at": created.isoformat(),
+        "tables": {t: {"rows": n} for t, n in rows.items()},
+        "form_schema": "form_schema.json",
+        "geo_index": "geo_index.json",
+    }
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    if os.path.isdir(final_dir):
+        # Same content published within the same second: keep the existing copy
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    else:
+        os.rename(tmp_dir, final_dir)
+
+    current_tmp = os.path.join(out_dir, "CURRENT.tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(name + "\n")
+    os.replace(current_tmp, os.path.join(out_dir, "CURRENT"))
+    print(f"   snapshot {version} published ({sum(rows.values())} rows)")
+
+    versions = sorted(d for d in os.listdir(out_dir) if os.path.isdir(os.path.join(out_dir, d)))
+    for old in versions[:-keep] if keep > 0 else []:
+        if old != name:
+            shutil.rmtree(os.path.join(out_dir, old), ignore_errors=True)
+
 def main():
     print("🚀 Import starting…")
-    print(f"🔧 DB target: mysql://{DB_HOST}:{DB_PORT}/{DB_NAME}")
+    target = make_url(DB_URL).render_as_string(hide_password=True) if DB_URL else f"mysql://{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    print(f"🔧 DB target: {target}")
     print(f"📦 Excel path: {EXCEL_PATH}")
 
     df = load_excel(EXCEL_PATH)
@@ -233,6 +417,10 @@ def main():
     insert_tools(eng, df)
     insert_links(eng, df)
     create_view(eng)
+    if SNAPSHOT_DIR:
+        write_snapshot(eng)
+    if SQL_PROFILE:
+        print_query_summary()
 
     print("✅ Done. Database rebuilt from Excel and view_tools_full created.")
 
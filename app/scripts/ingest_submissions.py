@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+ingest_submissions.py
+
+Moderated ingestion of suggestion-form submissions into MySQL.
+
+Submissions land in SUBMISSIONS_DIR as closed journals (submissions_*.jsonl,
+see SubmissionSink in app.py). This script stages them in `Tool_Submissions`,
+lets moderators approve or reject them, and applies approved rows to `Tools`
+and the `Tool_*` link tables with the importer's LINK_MAP semantics, one tool
+per transaction, without a drop-and-rebuild.
+
+Usage:
+  python ingest_submissions.py load
+  python ingest_submissions.py list [--status pending|approved|rejected|applied|all]
+  python ingest_submissions.py show <ref>
+  python ingest_submissions.py approve <ref> [<ref> ...] [--by NAME] [--set column=value ...]
+  python ingest_submissions.py reject  <ref> [<ref> ...] [--by NAME] [--note TEXT]
+  python ingest_submissions.py apply
+  python ingest_submissions.py export --out applied.xlsx
+
+Examples:
+  docker compose exec app python app/scripts/ingest_submissions.py load
+  docker compose exec app python app/scripts/ingest_submissions.py approve 20250101T120000Z_ab12cd34 \
+      --by anna --set tool_description="Web atlas of coastal flood risk." --set bullet1="Free to use"
+  docker compose exec app python app/scripts/ingest_submissions.py apply
+
+Applied tools get tool_id = MAX(tool_id) + 1. The importer still rebuilds the
+catalog from the master Excel, so `export` the applied rows (master-Excel
+layout, with their assigned tool_id) and append them to the Excel before the
+next full rebuild. The staging table itself survives rebuilds.
+"""
+
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+from sqlalchemy import text
+
+import build_db_from_excel as importer
+
+SUBMIT_DIR = Path(os.getenv("SUBMISSIONS_DIR", "/app/submissions")).resolve()
+LOADED_DIR = SUBMIT_DIR / "loaded"   # journals already staged are moved here
+STAGING_TABLE = "Tool_Submissions"
+STATUSES = ("pending", "approved", "rejected", "applied")
+
+# Suggestion-form payload keys -> master-Excel columns (COLS in the importer)
+FIELD_MAP: Dict[str, str] = {
+    "tool_name": "tool_name",
+    "link": "link",
+    "user_groups": "user_group",
+    "sectors": "sector",
+    "tool_types": "tool_type",
+    "target_scale_political": "political_scale",
+    "target_scale_physical": "physical_scale",
+    "temporal_scale": "temporal_scale",
+    "temporal_resolution": "temporal_resolution",
+    "methodological_approach": "methodological_approach",
+    "data_utilization": "data_utilization",
+    "output_type": "output_type",
+    "accessibility_and_usability": "accessibility_and_usability",
+    "is_multi_language": "is_multi_language",
+    "languages": "language",
+    "customizability": "customizability",
+    "integration_capability": "integration_capability",
+    "validation_and_reliability": "validation_and_reliability",
+    "cost": "cost",
+    "maintenance": "maintenance",
+    "support": "support",
+    "primary_area_scope": "primary_area_scope",
+    "primary_area_of_focus": "primary_area_of_focus",
+}
+
+
+def ensure_staging_table(engine):
+    mysql = importer.is_mysql(engine)
+    table_opts = " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4" if mysql else ""
+    status_key = ",\n          KEY idx_submissions_status (status)" if mysql else ""
+    with engine.begin() as con:
+        con.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {STAGING_TABLE} (
+          submission_ref VARCHAR(40) PRIMARY KEY,
+          submitted_at VARCHAR(20),
+          status VARCHAR(12) NOT NULL DEFAULT 'pending',
+          tool_name VARCHAR(255),
+          link TEXT,
+          payload MEDIUMTEXT,                -- JSON record as submitted
+          overrides TEXT,                    -- JSON {{column: value}} set by the moderator
+          source_file VARCHAR(255),
+          reviewer VARCHAR(100),
+          review_note TEXT,
+          reviewed_at TIMESTAMP NULL,
+          tool_id INT NULL,                  -- assigned on apply
+          loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP{status_key}
+        ){table_opts};
+        """))
+        if not mysql:
+            con.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_submissions_status ON {STAGING_TABLE} (status);"
+            ))
+
+
+def read_journals() -> List[tuple]:
+    """(file, records) for every closed journal, plus legacy one-submission JSON files."""
+    out = []
+    for path in sorted(SUBMIT_DIR.glob("submissions_*.jsonl")):
+        with path.open(encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        out.append((path, records))
+    # Files written before the journal: {timestamp}_{uuid}.json (+ .csv)
+    for path in sorted(SUBMIT_DIR.glob("*_*.json")):
+        rec = json.loads(path.read_text(encoding="utf-8"))
+        rec.setdefault("submission_ref", path.stem)
+        rec.setdefault("submitted_at", path.stem.split("_")[0])
+        out.append((path, [rec]))
+    return out
+
+
+def load(engine):
+    ensure_staging_table(engine)
+    journals = read_journals()
+    if not journals:
+        print("📭 No closed submission journals to load.")
+        return
+    with engine.connect() as con:
+        known = {r[0] for r in con.execute(text(f"SELECT submission_ref FROM {STAGING_TABLE}"))}
+
+    rows = []
+    for path, records in journals:
+        for rec in records:
+            ref = rec.get("submission_ref")
+            if not ref or ref in known:
+                continue
+            known.add(ref)
+            rows.append({
+                "submission_ref": ref,
+                "submitted_at": rec.get("submitted_at", ""),
+                "tool_name": str(rec.get("tool_name", ""))[:255],
+                "link": rec.get("link", ""),
+                "payload": json.dumps(rec, ensure_ascii=False),
+                "source_file": path.name,
+            })
+    with engine.begin() as con:
+        if rows:
+            con.execute(text(f"""
+                INSERT INTO {STAGING_TABLE} (submission_ref, submitted_at, tool_name, link, payload, source_file)
+                VALUES (:submission_ref, :submitted_at, :tool_name, :link, :payload, :source_file)
+            """), rows)
+
+    # Only after the commit: move the staged files out of the intake directory
+    LOADED_DIR.mkdir(parents=True, exist_ok=True)
+    for path, _ in journals:
+        for sibling in (path, path.with_suffix(".csv")):
+            if sibling.exists():
+                shutil.move(str(sibling), str(LOADED_DIR / sibling.name))
+    print(f"📥 Staged {len(rows)} new submission(s) from {len(journals)} file(s).")
+
+
+def list_submissions(engine, status: str):
+    ensure_staging_table(engine)
+    where = "" if status == "all" else "WHERE status = :status"
+    with engine.connect() as con:
+        df = pd.read_sql(text(f"""
+            SELECT submission_ref, submitted_at, status, tool_name, link, reviewer, tool_id
+            FROM {STAGING_TABLE} {where} ORDER BY submitted_at
+        """), con, params={"status": status})
+    if df.empty:
+        print(f"(no {status} submissions)")
+    else:
+        print(df.to_string(index=False))
+
+
+def show(engine, ref: str):
+    with engine.connect() as con:
+        row = con.execute(text(f"SELECT * FROM {STAGING_TABLE} WHERE submission_ref = :ref"),
+                          {"ref": ref}).mappings().first()
+    if row is None:
+        raise SystemExit(f"Unknown submission: {ref}")
+    print(json.dumps({**row, "payload": json.loads(row["payload"]),
+                      "overrides": json.loads(row["overrides"] or "{}")},
+                     ensure_ascii=False, indent=2, default=str))
+    print("Excel row:", json.dumps(to_excel_row(row), ensure_ascii=False, indent=2))
+
+
+def parse_overrides(pairs: List[str]) -> Dict[str, str]:
+    out = {}
+    for pair in pairs or []:
+        col, sep, value = pair.partition("=")
+        if not sep or col not in importer.COLS or col == "tool_id":
+            raise SystemExit(f"--set expects column=value with a master-Excel column, got: {pair!r}")
+        out[col] = value
+    return out
+
+
+def review(engine, refs: List[str], status: str, reviewer: str, note: str = "", overrides: Dict[str, str] = None):
+    with engine.begin() as con:
+        for ref in refs:
+            params = {"ref": ref, "status": status, "reviewer": reviewer, "note": note,
+                      "now": datetime.utcnow().replace(microsecond=0)}
+            sets = "status = :status, reviewer = :reviewer, review_note = :note, reviewed_at = :now"
+            if overrides:
+                sets += ", overrides = :overrides"
+                params["overrides"] = json.dumps(overrides, ensure_ascii=False)
+            res = con.execute(text(f"""
+                UPDATE {STAGING_TABLE} SET {sets}
+                WHERE submission_ref = :ref AND status IN ('pending', 'approved', 'rejected')
+            """), params)
+            print(f"{'✅' if res.rowcount else '⚠️ '} {ref}: {status if res.rowcount else 'not found or already applied'}")
+
+
+def to_excel_row(row) -> Dict[str, str]:
+    """Staged submission -> one master-Excel row (multi-values comma-separated, as in the Excel)."""
+    payload = json.loads(row["payload"])
+    out = {c: "" for c in importer.COLS}
+    for key, col in FIELD_MAP.items():
+        v = payload.get(key)
+        if isinstance(v, (list, tuple)):
+            v = ", ".join(str(x).strip() for x in v if str(x).strip())
+        out[col] = importer.norm(v)
+    out.update(json.loads(row["overrides"] or "{}"))
+    if row["tool_id"] is not None:
+        out["tool_id"] = int(row["tool_id"])
+    return out
+
+
+def apply(engine):
+    ensure_staging_table(engine)
+    with engine.connect() as con:
+        approved = con.execute(text(f"""
+            SELECT * FROM {STAGING_TABLE} WHERE status = 'approved' ORDER BY submitted_at
+        """)).mappings().all()
+    if not approved:
+        print("Nothing approved to apply.")
+        return
+
+    applied = 0
+    for row in approved:
+        excel_row = to_excel_row(row)
+        if not excel_row["tool_name"]:
+            print(f"⚠️  {row['submission_ref']}: empty tool_name, skipped")
+            continue
+        # One transaction per tool: Tools row, link rows and the staging status
+        with engine.begin() as con:
+            next_id = con.execute(text("SELECT COALESCE(MAX(tool_id), 0) + 1 FROM Tools")).scalar_one()
+            excel_row["tool_id"] = int(next_id)
+            df = pd.DataFrame([excel_row], columns=importer.COLS)
+            importer.insert_tools(con, df)
+            importer.insert_links(con, df)
+            con.execute(text(f"""
+                UPDATE {STAGING_TABLE} SET status = 'applied', tool_id = :tid WHERE submission_ref = :ref
+            """), {"tid": int(next_id), "ref": row["submission_ref"]})
+        applied += 1
+        print(f"➕ {row['submission_ref']} -> tool_id {next_id}: {excel_row['tool_name']}")
+
+    print(f"✅ Applied {applied} submission(s).")
+    if applied and importer.SNAPSHOT_DIR:
+        importer.write_snapshot(engine)
+
+
+def export(engine, out_path: str):
+    with engine.connect() as con:
+        rows = con.execute(text(f"""
+            SELECT * FROM {STAGING_TABLE} WHERE status = 'applied' ORDER BY tool_id
+        """)).mappings().all()
+    df = pd.DataFrame([to_excel_row(r) for r in rows], columns=importer.COLS)
+    if out_path.lower().endswith(".csv"):
+        df.to_csv(out_path, index=False)
+    else:
+        df.to_excel(out_path, sheet_name=importer.SHEET_NAME, index=False)
+    print(f"📤 Wrote {len(df)} applied row(s) to {out_path}")
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Stage, review and apply suggestion-form submissions.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("load", help="Stage closed journals from SUBMISSIONS_DIR into Tool_Submissions")
+    ls = sub.add_parser("list", help="List staged submissions")
+    ls.add_argument("--status", choices=[*STATUSES, "all"], default="pending")
+    sh = sub.add_parser("show", help="Show one staged submission and the Excel row it maps to")
+    sh.add_argument("ref")
+    for name in ("approve", "reject"):
+        r = sub.add_parser(name, help=f"{name.capitalize()} staged submissions")
+        r.add_argument("refs", nargs="+")
+        r.add_argument("--by", default=os.getenv("USER", "moderator"), help="Reviewer name")
+        r.add_argument("--note", default="", help="Review note")
+        if name == "approve":
+            r.add_argument("--set", action="append", metavar="COLUMN=VALUE",
+                           help="Fill or correct a master-Excel column before applying (repeatable)")
+    sub.add_parser("apply", help="Insert approved submissions into Tools and the Tool_* tables")
+    ex = sub.add_parser("export", help="Write applied submissions in the master-Excel layout")
+    ex.add_argument("--out", required=True, help=".xlsx (Inventory sheet) or .csv")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    eng = importer.make_engine()
+    if args.cmd == "load":
+        load(eng)
+    elif args.cmd == "list":
+        list_submissions(eng, args.status)
+    elif args.cmd == "show":
+        show(eng, args.ref)
+    elif args.cmd == "approve":
+        review(eng, args.refs, "approved", args.by, args.note, parse_overrides(args.set))
+    elif args.cmd == "reject":
+        review(eng, args.refs, "rejected", args.by, args.note)
+    elif args.cmd == "apply":
+        apply(eng)
+    elif args.cmd == "export":
+        export(eng, args.out)
+
+
+if __name__ == "__main__":
+    main()
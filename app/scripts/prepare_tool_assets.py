@@ -2,29 +2,78 @@
 """
 prepare_tool_assets.py
 
-Batch-crop and resize tool images into standardized PNG assets.
+Batch-crop and resize tool images into standardized PNG assets, and build
+right-sized variants of the site chrome (logos, team photos, hero banner).
 
 Usage:
-  python prepare_tool_assets.py <input_dir> <output_dir> <mode>
+  python prepare_tool_assets.py <input_dir> <output_dir> <mode> [--manifest PATH]
 
 Modes:
   - thumbnails -> 600x400 (3:2)
   - banners    -> 1200x200 (6:1)
+  - brand      -> minified SVGs (embedded bitmaps downscaled) + WebP/PNG at BRAND_WIDTHS
+  - team       -> square WebP/PNG portraits at TEAM_SIZES
+  - hero       -> WebP/JPEG banners at HERO_WIDTHS (PNG fallback if transparent)
+  - compress   -> .gz/.br siblings of every compressible file (recursive), for
+                  nginx gzip_static/brotli_static; output_dir mirrors input_dir
+                  (pass the same directory to write them in place)
+
+brand/team/hero also record their outputs in the asset manifest
+(public/assets/manifest.json by default), keyed by the original asset path.
+The app serves the optimized variant when an entry exists and falls back to
+the original file otherwise. Outputs must live under the manifest's directory.
 
 Examples:
   python prepare_tool_assets.py /path/to/raw/thumbnails /path/to/out thumbnails
   python prepare_tool_assets.py /path/to/raw/banners    /path/to/out banners
+  python prepare_tool_assets.py public/assets/adapt-tools-logo public/assets/optimized/brand brand
+  python prepare_tool_assets.py public/assets/team             public/assets/optimized/team  team
+  python prepare_tool_assets.py public/assets/site_banner      public/assets/optimized/hero  hero
+  python prepare_tool_assets.py public/assets                  public/assets                 compress
 """
 
 import argparse
+import base64
+import gzip
+import io
+import json
+import os
+import re
 import sys
+import xml.etree.ElementTree as ET
 from pathlib import Path
 from PIL import Image, ImageOps
 
+try:  # optional: pip install brotli (only needed for .br siblings)
+    import brotli
+except ImportError:
+    brotli = None
+
 THUMBNAIL_SIZE = (600, 400)   # 3:2
 BANNER_SIZE    = (1200, 200)  # 6:1
 VALID_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".bmp"}
 
+# Site chrome presets (CSS px x2 for high-DPI screens)
+BRAND_WIDTHS = (320, 640)     # header logos are 44-72px tall, sidebar logo <= 250px wide
+BRAND_MAX_PX = 640            # longest rendered edge of a minified SVG's embedded bitmap
+TEAM_SIZES   = (180, 360)     # .person-card .avatar is 180x180
+HERO_WIDTHS  = (960, 1600)    # .hero background, full content width
+WEBP_QUALITY = 82
+JPEG_QUALITY = 82
+
+CHROME_MODES = {"brand", "team", "hero"}
+
+# Text-like assets worth precompressing; PNG/JPEG/WebP are already compressed
+COMPRESSIBLE_EXTS = {".svg", ".html", ".css", ".js", ".mjs", ".json", ".txt", ".xml", ".ico", ".map", ".wasm"}
+MIN_COMPRESS_BYTES = 256      # below this the headers outweigh the savings
+MIN_COMPRESS_SAVING = 0.05    # keep a sibling only if it's at least 5% smaller
+DEFAULT_MANIFEST = Path(__file__).resolve().parents[2] / "public" / "assets" / "manifest.json"
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
 
 def parse_args():
     p = argparse.ArgumentParser(
@@ -35,9 +84,15 @@ def parse_args():
     p.add_argument(
         "mode",
         type=str,
-        choices=["thumbnails", "banners"],
+        choices=["thumbnails", "banners", "brand", "team", "hero", "compress"],
         help="Output format/size preset",
     )
+    p.add_argument(
+        "--manifest",
+        type=str,
+        default=str(DEFAULT_MANIFEST),
+        help="Asset manifest updated by brand/team/hero (default: public/assets/manifest.json)",
+    )
     p.add_argument(
         "--centered",
         action="store_true",
@@ -94,16 +149,366 @@ def process_image(src: Path, dst_dir: Path, out_size: tuple[int, int]) -> tuple[
         return False, f"FAIL -> {src.name}: {e}"
 
 
+# ---------- Site chrome (brand / team / hero) ----------
+
+def _px(value: str | None) -> float:
+    m = re.match(r"\s*([0-9.]+)", value or "")
+    return float(m.group(1)) if m else 0.0
+
+
+def _href(el: ET.Element) -> str:
+    return el.get(f"{{{XLINK_NS}}}href") or el.get("href") or ""
+
+
+def _set_href(el: ET.Element, value: str) -> None:
+    key = f"{{{XLINK_NS}}}href" if el.get(f"{{{XLINK_NS}}}href") is not None else "href"
+    el.set(key, value)
+
+
+def _decode_data_uri(uri: str) -> Image.Image | None:
+    m = re.match(r"data:image/[a-z+]+;base64,", uri)
+    if not m:
+        return None
+    im = Image.open(io.BytesIO(base64.b64decode(uri[m.end():])))
+    im.load()
+    return im
+
+
+def _encode_png(im: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    im.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def resize_to_width(im: Image.Image, width: int) -> Image.Image:
+    if im.width <= width:
+        return im.copy()
+    height = max(1, round(im.height * width / im.width))
+    return im.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def widths_for(src_width: int, presets: tuple[int, ...]) -> list[int]:
+    """Preset widths that don't upscale; the source width if it's smaller than all of them."""
+    return [w for w in presets if w <= src_width] or [src_width]
+
+
+def save_variants(im: Image.Image, dst_dir: Path, stem: str, widths: list[int],
+                  fallback: str, square: bool = False) -> dict[str, list[tuple[int, Path]]]:
+    """
+    Write <stem>-<w>.webp plus a PNG/JPEG fallback for each width.
+    Returns {mime: [(width, path), ...]}.
+    """
+    out: dict[str, list[tuple[int, Path]]] = {"image/webp": [], f"image/{fallback}": []}
+    for w in widths:
+        v = ImageOps.fit(im, (w, w), method=Image.Resampling.LANCZOS) if square else resize_to_width(im, w)
+        webp = dst_dir / f"{stem}-{w}.webp"
+        v.save(webp, format="WEBP", quality=WEBP_QUALITY, method=6)
+        out["image/webp"].append((w, webp))
+        if fallback == "jpeg":
+            fb = dst_dir / f"{stem}-{w}.jpg"
+            v.convert("RGB").save(fb, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            fb = dst_dir / f"{stem}-{w}.png"
+            v.save(fb, format="PNG", optimize=True)
+        out[f"image/{fallback}"].append((w, fb))
+    return out
+
+
+def minify_svg(src: Path, max_px: int) -> tuple[bytes, Image.Image | None]:
+    """
+    Parse an SVG, downscale embedded data-URI bitmaps to what the viewBox needs
+    at max_px on its longest edge, and re-serialize without the XML prolog,
+    DOCTYPE, comments, editor namespaces or indentation.
+
+    Returns (svg_bytes, raster). raster is the flattened canvas when the SVG is
+    only embedded bitmaps (e.g. exported logos), else None.
+    """
+    tree = ET.parse(src)
+    root = tree.getroot()
+    vb = [float(x) for x in (root.get("viewBox") or "0 0 0 0").replace(",", " ").split()]
+    vb_w, vb_h = vb[2] or _px(root.get("width")), vb[3] or _px(root.get("height"))
+    scale = min(1.0, max_px / max(vb_w, vb_h)) if vb_w and vb_h else 1.0
+
+    bitmaps: dict[str, Image.Image] = {}
+    for el in root.iter(f"{{{SVG_NS}}}image"):
+        im = _decode_data_uri(_href(el))
+        if im is None:
+            continue
+        target_w = round((_px(el.get("width")) or im.width) * scale)
+        if target_w and im.width > target_w:
+            im = resize_to_width(im, target_w)
+            _set_href(el, "data:image/png;base64," + base64.b64encode(_encode_png(im)).decode("ascii"))
+        bitmaps[el.get("id") or f"_anon{len(bitmaps)}"] = im
+
+    for el in root.iter():
+        if el.text and not el.text.strip():
+            el.text = None
+        if el.tail and not el.tail.strip():
+            el.tail = None
+    for attr in [a for a in root.attrib if a.startswith("{http://www.w3.org/XML/1998/namespace}")]:
+        del root.attrib[attr]
+
+    svg_bytes = ET.tostring(root, encoding="utf-8", xml_declaration=False)
+    return svg_bytes, _flatten_svg(root, bitmaps, vb_w, vb_h, scale)
+
+
+def _flatten_svg(root: ET.Element, bitmaps: dict[str, Image.Image],
+                 vb_w: float, vb_h: float, scale: float) -> Image.Image | None:
+    """Composite <use>/<image> placements onto a transparent canvas; None if anything else draws."""
+    if not bitmaps or not vb_w or not vb_h:
+        return None
+    canvas = Image.new("RGBA", (round(vb_w * scale), round(vb_h * scale)), (0, 0, 0, 0))
+    for el in root:
+        tag = el.tag.split("}")[-1]
+        if tag in ("defs", "title", "desc", "metadata"):
+            continue
+        if tag == "use":
+            im = bitmaps.get(_href(el).lstrip("#"))
+        elif tag == "image":
+            im = bitmaps.get(el.get("id") or "")
+        else:
+            return None
+        if im is None or el.get("transform"):
+            return None
+        w = round(_px(el.get("width")) * scale) or im.width
+        h = round(_px(el.get("height")) * scale) or im.height
+        layer = im.convert("RGBA")
+        if layer.size != (w, h):
+            layer = layer.resize((w, h), Image.Resampling.LANCZOS)
+        canvas.alpha_composite(layer, (round(_px(el.get("x")) * scale), round(_px(el.get("y")) * scale)))
+    return canvas
+
+
+class AssetManifest:
+    """
+    public/assets/manifest.json:
+      {"assets": {"<original rel path>": {"src": <default rel path>, "width", "height",
+                                           "bytes": [original, default],
+                                           "srcset": {mime: [[w, rel path], ...]}}}}
+    Paths are relative to the manifest's directory (= the /assets URL root).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.root = path.parent
+        try:
+            self.data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.data = {}
+        self.data.setdefault("assets", {})
+
+    def rel(self, p: Path) -> str:
+        return p.resolve().relative_to(self.root.resolve()).as_posix()
+
+    def record(self, original: Path, default: Path, size: tuple[int, int],
+               srcset: dict[str, list[tuple[int, Path]]]) -> None:
+        self.data["assets"][self.rel(original)] = {
+            "src": self.rel(default),
+            "width": size[0],
+            "height": size[1],
+            "bytes": [original.stat().st_size, default.stat().st_size],
+            "srcset": {mime: [[w, self.rel(p)] for w, p in items] for mime, items in srcset.items() if items},
+        }
+
+    def save(self) -> None:
+        self.data["assets"] = dict(sorted(self.data["assets"].items()))
+        self.path.write_text(json.dumps(self.data, indent=2) + "\n", encoding="utf-8")
+
+
+def process_chrome(src: Path, dst_dir: Path, mode: str, manifest: AssetManifest) -> tuple[bool, str]:
+    """
+    brand: .svg -> <stem>.min.svg (+ raster variants when flattenable); bitmaps -> WebP/PNG
+    team : square WebP/PNG at TEAM_SIZES
+    hero : WebP/JPEG at HERO_WIDTHS
+    """
+    # The source extension is part of the variant names: logo.svg and logo.png
+    # sit side by side in the brand folder and must not overwrite each other.
+    stem = f"{src.stem}-{src.suffix.lstrip('.').lower()}"
+    try:
+        if mode == "brand" and src.suffix.lower() == ".svg":
+            svg_bytes, raster = minify_svg(src, BRAND_MAX_PX)
+            default = dst_dir / f"{src.stem}.min.svg"
+            default.write_bytes(svg_bytes)
+            srcset = {}
+            if raster is not None:
+                srcset = save_variants(raster, dst_dir, stem, widths_for(raster.width, BRAND_WIDTHS), "png")
+            size = raster.size if raster is not None else (0, 0)
+        else:
+            with Image.open(src) as im:
+                im.load()
+                if im.mode not in ("RGB", "RGBA"):
+                    im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+                if mode == "team":
+                    side = min(im.size)
+                    srcset = save_variants(im, dst_dir, stem, widths_for(side, TEAM_SIZES), "png", square=True)
+                elif mode == "hero":
+                    # Photos fall back to JPEG; anything with transparency keeps PNG
+                    fallback = "png" if im.mode == "RGBA" else "jpeg"
+                    srcset = save_variants(im, dst_dir, stem, widths_for(im.width, HERO_WIDTHS), fallback)
+                else:
+                    srcset = save_variants(im, dst_dir, stem, widths_for(im.width, BRAND_WIDTHS), "png")
+            _, default = srcset["image/webp"][-1]
+            with Image.open(default) as out:
+                size = out.size
+
+        manifest.record(src, default, size, srcset)
+        before, after = src.stat().st_size, default.stat().st_size
+        return True, f"OK   -> {default.name} ({before / 1024:.0f} KB -> {after / 1024:.0f} KB)"
+    except Exception as e:
+        return False, f"FAIL -> {src.name}: {e}"
+
+
+def main_chrome(args, input_dir: Path, output_dir: Path) -> None:
+    manifest_path = Path(args.manifest).expanduser().resolve()
+    try:
+        output_dir.relative_to(manifest_path.parent)
+        input_dir.relative_to(manifest_path.parent)
+    except ValueError:
+        print(f"[ERROR] Input and output must live under {manifest_path.parent} (the /assets root)")
+        sys.exit(1)
+
+    exts = VALID_EXTS | {".svg"} if args.mode == "brand" else VALID_EXTS
+    files = sorted(p for p in input_dir.iterdir() if p.is_file() and p.suffix.lower() in exts)
+    if not files:
+        print(f"[WARN] No image files found in {input_dir}. Valid extensions: {sorted(exts)}")
+        sys.exit(0)
+
+    manifest = AssetManifest(manifest_path)
+    print(f"[INFO] Mode: {args.mode}")
+    print(f"[INFO] Input   : {input_dir}")
+    print(f"[INFO] Output  : {output_dir}")
+    print(f"[INFO] Manifest: {manifest_path}")
+    print(f"[INFO] Found {len(files)} image(s). Processing...\n")
+
+    ok, fail, before, after = 0, 0, 0, 0
+    for src in files:
+        success, msg = process_chrome(src, output_dir, args.mode, manifest)
+        if success:
+            ok += 1
+            entry = manifest.data["assets"][manifest.rel(src)]
+            before += entry["bytes"][0]
+            after += entry["bytes"][1]
+        else:
+            fail += 1
+        print(msg)
+    manifest.save()
+
+    print("\n[SUMMARY]")
+    print(f"  Success : {ok}")
+    print(f"  Failed  : {fail}")
+    print(f"  Weight  : {before / 1024:.0f} KB -> {after / 1024:.0f} KB (default variants)")
+    print(f"  Output  : {output_dir}")
+    print(f"  Manifest: {manifest_path}")
+
+
+# ---------- Precompression (gzip_static / brotli_static) ----------
+
+def _gzip_max(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-identical across runs
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli_max(data: bytes) -> bytes:
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11, lgwin=24)
+
+
+def sibling_fresh(src_stat: os.stat_result, dst: Path) -> bool:
+    """dst was written from the current src (siblings carry the source mtime)."""
+    try:
+        return dst.stat().st_mtime >= src_stat.st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def write_sibling(src_stat: os.stat_result, dst: Path, data: bytes, encode) -> str:
+    """
+    Write dst (= <file>.gz / <file>.br) from the source bytes. Drops the
+    sibling when compression doesn't pay off, so nginx falls back to the
+    original. Returns "written" or "skipped".
+    """
+    out = encode(data)
+    if len(out) > len(data) * (1 - MIN_COMPRESS_SAVING):
+        dst.unlink(missing_ok=True)
+        return "skipped"
+    tmp = dst.with_name(dst.name + ".tmp")
+    tmp.write_bytes(out)
+    os.replace(tmp, dst)
+    # Same mtime as the original so Last-Modified/ETag match either way
+    os.utime(dst, (src_stat.st_atime, src_stat.st_mtime))
+    return "written"
+
+
+def main_compress(input_dir: Path, output_dir: Path) -> None:
+    files = sorted(
+        p for p in input_dir.rglob("*")
+        if p.is_file() and p.suffix.lower() in COMPRESSIBLE_EXTS and p.stat().st_size >= MIN_COMPRESS_BYTES
+    )
+    if not files:
+        print(f"[WARN] No compressible files found in {input_dir}. Extensions: {sorted(COMPRESSIBLE_EXTS)}")
+        sys.exit(0)
+
+    encoders = [(".gz", _gzip_max)]
+    if brotli is not None:
+        encoders.append((".br", _brotli_max))
+    else:
+        print("[WARN] brotli not installed (pip install brotli); writing .gz only")
+
+    print("[INFO] Mode: compress -> " + " + ".join(ext for ext, _ in encoders))
+    print(f"[INFO] Input : {input_dir}")
+    print(f"[INFO] Output: {output_dir}")
+    print(f"[INFO] Found {len(files)} compressible file(s). Processing...\n")
+
+    counts = {"written": 0, "fresh": 0, "skipped": 0}
+    fail, before, after = 0, 0, {ext: 0 for ext, _ in encoders}
+    for src in files:
+        dst_base = output_dir / src.relative_to(input_dir)
+        dst_base.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            src_stat = src.stat()
+            before += src_stat.st_size
+            data = None  # read only if some sibling is stale
+            notes = []
+            for ext, encode in encoders:
+                dst = dst_base.with_name(dst_base.name + ext)
+                if sibling_fresh(src_stat, dst):
+                    status = "fresh"
+                else:
+                    data = src.read_bytes() if data is None else data
+                    status = write_sibling(src_stat, dst, data, encode)
+                counts[status] += 1
+                after[ext] += dst.stat().st_size if dst.exists() else src_stat.st_size
+                notes.append(f"{ext} {status}")
+            print(f"OK   -> {src.relative_to(input_dir)} ({', '.join(notes)})")
+        except Exception as e:
+            fail += 1
+            print(f"FAIL -> {src.relative_to(input_dir)}: {e}")
+
+    print("\n[SUMMARY]")
+    print(f"  Written: {counts['written']}  Up to date: {counts['fresh']}  Not worth it: {counts['skipped']}")
+    print(f"  Failed : {fail}")
+    for ext, total in after.items():
+        print(f"  {ext:<7}: {before / 1024:.0f} KB -> {total / 1024:.0f} KB on the wire")
+    print(f"  Output : {output_dir}")
+
+
 def main():
     args = parse_args()
     input_dir = Path(args.input_dir).expanduser().resolve()
     output_dir = Path(args.output_dir).expanduser().resolve()
-    out_size = target_size_for_mode(args.mode)
 
     if not input_dir.exists() or not input_dir.is_dir():
         print(f"[ERROR] Input directory does not exist or is not a directory: {input_dir}")
         sys.exit(1)
 
+    if args.mode in CHROME_MODES:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        main_chrome(args, input_dir, output_dir)
+        return
+    if args.mode == "compress":
+        main_compress(input_dir, output_dir)
+        return
+
+    out_size = target_size_for_mode(args.mode)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     files = sorted([p for p in input_dir.iterdir() if is_image_file(p)])
@@ -20,5 +20,11 @@ fi
 # build (add --no-cache if you ran with --clean)
 docker compose build $NOCACHE
 
+# precompress public/assets for nginx gzip_static (nginx serves ./public from
+# the host, so the .gz siblings are written there; only changed files are redone)
+echo "Precompressing static assets…"
+docker compose run --rm --no-deps --user "$(id -u):$(id -g)" app \
+  python app/scripts/prepare_tool_assets.py public/assets public/assets compress
+
 # bring the stack up
 docker compose up -d
\ No newline at end of file